@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import ClassVar, Iterator, Optional
 from typing import TYPE_CHECKING, ClassVar, Optional
 
-from TikTokApi.exceptions import InvalidResponseException
+from TikTokApi.pagination import paginate
 
 if TYPE_CHECKING:
     from ..tiktok import TikTokApi
@@ -52,36 +52,19 @@ class Comment:
         self.likes_count = self.as_dict["digg_count"]
 
     async def replies(self, count=20, cursor=0, **kwargs) -> Iterator[Comment]:
-        found = 0
-
-        while found < count:
-            params = {
-                "count": 20,
-                "cursor": cursor,
+        async for comment in paginate(
+            self.parent,
+            "https://www.tiktok.com/api/comment/list/reply/",
+            {
                 "item_id": self.author.user_id,
                 "comment_id": self.id,
-            }
-
-            resp = await self.parent.make_request(
-                url="https://www.tiktok.com/api/comment/list/reply/",
-                params=params,
-                headers=kwargs.get("headers"),
-                session_index=kwargs.get("session_index"),
-            )
-
-            if resp is None:
-                raise InvalidResponseException(
-                    resp, "TikTok returned an invalid response."
-                )
-
-            for comment in resp.get("comments", []):
-                yield self.parent.comment(data=comment)
-                found += 1
-
-            if not resp.get("has_more", False):
-                return
-
-            cursor = resp.get("cursor")
+            },
+            "comments",
+            count,
+            cursor,
+            **kwargs,
+        ):
+            yield self.parent.comment(data=comment)
 
     def __repr__(self):
         return self.__str__()
@@ -2,7 +2,7 @@ from __future__ import annotations
 from urllib.parse import urlencode
 from typing import TYPE_CHECKING, Iterator
 from .user import User
-from ..exceptions import InvalidResponseException
+from ..pagination import paginate
 
 if TYPE_CHECKING:
     from ..tiktok import TikTokApi
@@ -23,6 +23,7 @@ class Search:
         Args:
             search_term (str): The phrase you want to search for.
             count (int): The amount of users you want returned.
+            stop (Callable[[dict], bool]): Called with the raw data of each result, stops before the first one it returns True for.
 
         Returns:
             async iterator/generator: Yields TikTokApi.user objects.
@@ -56,6 +57,7 @@ class Search:
             obj_type (str): The type of object you want to search for (user)
             count (int): The amount of users you want returned.
             cursor (int): The the offset of users from 0 you want to get.
+            stop (Callable[[dict], bool]): Called with the raw data of each result, stops before the first one it returns True for.
 
         Returns:
             async iterator/generator: Yields TikTokApi.video objects.
@@ -69,38 +71,25 @@ class Search:
                 async for user in api.search.search_type('david teather', 'user'):
                     # do something
         """
-        found = 0
-        while found < count:
-            params = {
-                "keyword": search_term,
-                "cursor": cursor,
-                "from_page": "search",
-                "web_search_code": """{"tiktok":{"client_params_x":{"search_engine":{"ies_mt_user_live_video_card_use_libra":1,"mt_search_general_user_live_card":1}},"search_server":{}}}""",
-            }
-
-            resp = await Search.parent.make_request(
-                url=f"https://www.tiktok.com/api/search/{obj_type}/full/",
-                params=params,
-                headers=kwargs.get("headers"),
-                session_index=kwargs.get("session_index"),
-            )
-
-            if resp is None:
-                raise InvalidResponseException(
-                    resp, "TikTok returned an invalid response."
-                )
-
+        params = {
+            "keyword": search_term,
+            "from_page": "search",
+            "web_search_code": """{"tiktok":{"client_params_x":{"search_engine":{"ies_mt_user_live_video_card_use_libra":1,"mt_search_general_user_live_card":1}},"search_server":{}}}""",
+        }
+        async for item in paginate(
+            Search.parent,
+            f"https://www.tiktok.com/api/search/{obj_type}/full/",
+            params,
+            "user_list",
+            count,
+            cursor,
+            count_param=None,
+            **kwargs,
+        ):
             if obj_type == "user":
-                for user in resp.get("user_list", []):
-                    sec_uid = user.get("user_info").get("sec_uid")
-                    uid = user.get("user_info").get("user_id")
-                    username = user.get("user_info").get("unique_id")
-                    yield Search.parent.user(
-                        sec_uid=sec_uid, user_id=uid, username=username
-                    )
-                    found += 1
-
-            if not resp.get("has_more", False):
-                return
-
-            cursor = resp.get("cursor")
+                sec_uid = item.get("user_info").get("sec_uid")
+                uid = item.get("user_info").get("user_id")
+                username = item.get("user_info").get("unique_id")
+                yield Search.parent.user(
+                    sec_uid=sec_uid, user_id=uid, username=username
+                )
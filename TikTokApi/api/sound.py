@@ -1,5 +1,6 @@
 from __future__ import annotations
 from ..exceptions import *
+from ..pagination import paginate, paginate_sharded
 from typing import TYPE_CHECKING, ClassVar, Iterator, Optional
 
 if TYPE_CHECKING:
@@ -75,6 +76,8 @@ class Sound:
             params=url_params,
             headers=kwargs.get("headers"),
             session_index=kwargs.get("session_index"),
+            timeout=kwargs.get("timeout"),
+            deadline=kwargs.get("deadline"),
         )
 
         if resp is None:
@@ -91,6 +94,12 @@ class Sound:
         Args:
             count (int): The amount of videos you want returned.
             cursor (int): The the offset of videos from 0 you want to get.
+            prefetch (int): The amount of pages fetched ahead while you consume the current one, 0 to disable.
+            shards (int): Fetch this many ranges of offsets in parallel on different sessions.
+            ordered (bool): With shards, False yields videos as they arrive instead of in order.
+            since (datetime | float): Only get videos posted at or after this datetime or unix timestamp.
+            until (datetime | float): Only get videos posted before this datetime or unix timestamp.
+            stop (Callable[[dict], bool]): Called with the raw data of each video, stops before the first one it returns True for.
 
         Returns:
             async iterator/generator: Yields TikTokApi.video objects.
@@ -110,34 +119,17 @@ class Sound:
                 "You must provide the id when creating this class to use this method."
             )
 
-        found = 0
-        while found < count:
-            params = {
-                "musicID": id,
-                "count": 30,
-                "cursor": cursor,
-            }
-
-            resp = await self.parent.make_request(
-                url="https://www.tiktok.com/api/music/item_list/",
-                params=params,
-                headers=kwargs.get("headers"),
-                session_index=kwargs.get("session_index"),
-            )
-
-            if resp is None:
-                raise InvalidResponseException(
-                    resp, "TikTok returned an invalid response."
-                )
-
-            for video in resp.get("itemList", []):
-                yield self.parent.video(data=video)
-                found += 1
-
-            if not resp.get("hasMore", False):
-                return
-
-            cursor = resp.get("cursor")
+        pages = paginate_sharded if kwargs.get("shards") else paginate
+        async for video in pages(
+            self.parent,
+            "https://www.tiktok.com/api/music/item_list/",
+            {"musicID": id},
+            "itemList",
+            count,
+            cursor,
+            **kwargs,
+        ):
+            yield self.parent.video(data=video)
 
     def __extract_from_data(self):
         data = self.as_dict
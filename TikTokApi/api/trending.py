@@ -1,5 +1,5 @@
 from __future__ import annotations
-from ..exceptions import InvalidResponseException
+from ..pagination import paginate
 from .video import Video
 
 from typing import TYPE_CHECKING, Iterator
@@ -20,6 +20,9 @@ class Trending:
 
         Args:
             count (int): The amount of videos you want returned.
+            since (datetime | float): Only get videos posted at or after this datetime or unix timestamp.
+            until (datetime | float): Only get videos posted before this datetime or unix timestamp.
+            stop (Callable[[dict], bool]): Called with the raw data of each video, stops before the first one it returns True for.
 
         Returns:
             async iterator/generator: Yields TikTokApi.video objects.
@@ -33,28 +36,13 @@ class Trending:
                 async for video in api.trending.videos():
                     # do something
         """
-        found = 0
-        while found < count:
-            params = {
-                "from_page": "fyp",
-                "count": count,
-            }
-
-            resp = await Trending.parent.make_request(
-                url="https://www.tiktok.com/api/recommend/item_list/",
-                params=params,
-                headers=kwargs.get("headers"),
-                session_index=kwargs.get("session_index"),
-            )
-
-            if resp is None:
-                raise InvalidResponseException(
-                    resp, "TikTok returned an invalid response."
-                )
-
-            for video in resp.get("itemList", []):
-                yield Trending.parent.video(data=video)
-                found += 1
-
-            if not resp.get("hasMore", False):
-                return
+        async for video in paginate(
+            Trending.parent,
+            "https://www.tiktok.com/api/recommend/item_list/",
+            {"from_page": "fyp"},
+            "itemList",
+            count,
+            cursor_param=None,
+            **kwargs,
+        ):
+            yield Trending.parent.video(data=video)
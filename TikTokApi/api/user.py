@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING, ClassVar, Iterator, Optional
 from ..exceptions import InvalidResponseException
+from ..pagination import paginate, paginate_by_time
 
 if TYPE_CHECKING:
     from ..tiktok import TikTokApi
@@ -78,6 +79,8 @@ class User:
             params=url_params,
             headers=kwargs.get("headers"),
             session_index=kwargs.get("session_index"),
+            timeout=kwargs.get("timeout"),
+            deadline=kwargs.get("deadline"),
         )
 
         if resp is None:
@@ -93,7 +96,13 @@ class User:
 
         Args:
             count (int): The amount of videos you want returned.
-            cursor (int): The the offset of videos from 0 you want to get.
+            cursor (int): The timestamp in milliseconds to get videos posted before, 0 for the latest.
+            prefetch (int): The amount of pages fetched ahead while you consume the current one, 0 to disable.
+            shards (int): Fetch this many windows of time in parallel on different sessions, videos are still yielded newest first.
+            window (float): With shards, the length of each window in seconds, defaults to 30 days.
+            since (datetime | float): Only get videos posted at or after this datetime or unix timestamp.
+            until (datetime | float): Only get videos posted before this datetime or unix timestamp.
+            stop (Callable[[dict], bool]): Called with the raw data of each video, stops before the first one it returns True for.
 
         Returns:
             async iterator/generator: Yields TikTokApi.video objects.
@@ -111,34 +120,17 @@ class User:
         if sec_uid is None or sec_uid == "":
             await self.info(**kwargs)
 
-        found = 0
-        while found < count:
-            params = {
-                "secUid": self.sec_uid,
-                "count": count,
-                "cursor": cursor,
-            }
-
-            resp = await self.parent.make_request(
-                url="https://www.tiktok.com/api/post/item_list/",
-                params=params,
-                headers=kwargs.get("headers"),
-                session_index=kwargs.get("session_index"),
-            )
-
-            if resp is None:
-                raise InvalidResponseException(
-                    resp, "TikTok returned an invalid response."
-                )
-
-            for video in resp.get("itemList", []):
-                yield self.parent.video(data=video)
-                found += 1
-
-            if not resp.get("hasMore", False):
-                return
-
-            cursor = resp.get("cursor")
+        pages = paginate_by_time if kwargs.get("shards") else paginate
+        async for video in pages(
+            self.parent,
+            "https://www.tiktok.com/api/post/item_list/",
+            {"secUid": self.sec_uid},
+            "itemList",
+            count,
+            cursor,
+            **kwargs,
+        ):
+            yield self.parent.video(data=video)
 
     async def liked(
         self, count: int = 30, cursor: int = 0, **kwargs
@@ -149,6 +141,10 @@ class User:
         Args:
             count (int): The amount of recent likes you want returned.
             cursor (int): The the offset of likes from 0 you want to get.
+            prefetch (int): The amount of pages fetched ahead while you consume the current one, 0 to disable.
+            since (datetime | float): Only get videos posted at or after this datetime or unix timestamp.
+            until (datetime | float): Only get videos posted before this datetime or unix timestamp.
+            stop (Callable[[dict], bool]): Called with the raw data of each video, stops before the first one it returns True for.
 
         Returns:
             async iterator/generator: Yields TikTokApi.video objects.
@@ -166,34 +162,16 @@ class User:
         if sec_uid is None or sec_uid == "":
             await self.info(**kwargs)
 
-        found = 0
-        while found < count:
-            params = {
-                "secUid": self.sec_uid,
-                "count": 35,
-                "cursor": cursor,
-            }
-
-            resp = await self.parent.make_request(
-                url="https://www.tiktok.com/api/favorite/item_list",
-                params=params,
-                headers=kwargs.get("headers"),
-                session_index=kwargs.get("session_index"),
-            )
-
-            if resp is None:
-                raise InvalidResponseException(
-                    resp, "TikTok returned an invalid response."
-                )
-
-            for video in resp.get("itemList", []):
-                yield self.parent.video(data=video)
-                found += 1
-
-            if not resp.get("hasMore", False):
-                return
-
-            cursor = resp.get("cursor")
+        async for video in paginate(
+            self.parent,
+            "https://www.tiktok.com/api/favorite/item_list",
+            {"secUid": self.sec_uid},
+            "itemList",
+            count,
+            cursor,
+            **kwargs,
+        ):
+            yield self.parent.video(data=video)
 
     def __extract_from_data(self):
         data = self.as_dict
@@ -1,11 +1,17 @@
 from __future__ import annotations
-from ..helpers import extract_video_id_from_url
+from ..helpers import extract_video_id_from_url, requests_proxies
 from typing import TYPE_CHECKING, ClassVar, Iterator, Optional
 from datetime import datetime
+import asyncio
 import requests
-from ..exceptions import InvalidResponseException
+import time
+from ..exceptions import InvalidResponseException, TimeoutException
+from ..pagination import paginate, paginate_sharded
 import json
 
+# requests.get runs in a thread that can't be cancelled, so it always gets a timeout
+_INFO_TIMEOUT = 30
+
 if TYPE_CHECKING:
     from ..tiktok import TikTokApi
     from .user import User
@@ -63,9 +69,11 @@ class Video:
             self.id = extract_video_id_from_url(
                 url,
                 headers=session.headers,
-                proxy=kwargs.get("proxy")
-                if kwargs.get("proxy") is not None
-                else session.proxy,
+                proxy=requests_proxies(
+                    kwargs.get("proxy")
+                    if kwargs.get("proxy") is not None
+                    else session.proxy
+                ),
             )
 
         if getattr(self, "id", None) is None:
@@ -77,11 +85,19 @@ class Video:
 
         Note: This is slow since it requires an HTTP request, avoid using this if possible.
 
+        Note: When the request is hedged the slower request's result is dropped, but
+        its thread can't be cancelled and keeps running until it finishes or times out.
+
+        Args:
+            timeout (float): The maximum time in seconds the request may take, defaults to 30.
+            hedge (bool): Whether to send a second request through another session if the first is slow.
+
         Returns:
             dict: A dictionary of all data associated with a TikTok Video.
 
         Raises:
             InvalidResponseException: If TikTok returns an invalid response, or one we don't understand.
+            TimeoutException: If the request took longer than timeout.
 
         Example Usage:
             .. code-block:: python
@@ -89,14 +105,50 @@ class Video:
                 url = "https://www.tiktok.com/@davidteathercodes/video/7106686413101468970"
                 video_info = await api.video(url=url).info()
         """
-        i, session = self.parent._get_session(**kwargs)
-        proxy = (
-            kwargs.get("proxy") if kwargs.get("proxy") is not None else session.proxy
-        )
         if self.url is None:
             raise TypeError("To call video.info() you need to set the video's url.")
 
-        r = requests.get(self.url, headers=session.headers, proxies=proxy)
+        sessions = []
+        timeout = kwargs.get("timeout") or _INFO_TIMEOUT
+
+        async def fetch(attempt):
+            if attempt == 0:
+                i, session = self.parent._get_session(**kwargs)
+            else:
+                # the hedge goes through a different session, and so a different proxy
+                i, session = self.parent.session_pool.pick(exclude=sessions)
+            sessions.append(session)
+            proxy = (
+                kwargs.get("proxy")
+                if kwargs.get("proxy") is not None
+                else session.proxy
+            )
+            start = time.monotonic()
+            try:
+                r = await asyncio.to_thread(
+                    requests.get,
+                    self.url,
+                    headers=session.headers,
+                    proxies=requests_proxies(proxy),
+                    timeout=timeout,
+                )
+            except requests.RequestException as e:
+                self.parent._record_proxy(proxy, time.monotonic() - start, False)
+                if isinstance(e, requests.Timeout):
+                    raise TimeoutException(
+                        None, f"Request timed out after {timeout} seconds"
+                    )
+                raise
+            self.parent._record_proxy(
+                proxy, time.monotonic() - start, r.status_code == 200
+            )
+            return r
+
+        r = await self.parent._hedged(
+            "video.info",
+            fetch,
+            hedge=kwargs.get("hedge", True) and kwargs.get("session_index") is None,
+        )
         if r.status_code != 200:
             raise InvalidResponseException(
                 r.text, "TikTok returned an invalid response.", error_code=r.status_code
@@ -241,6 +293,12 @@ class Video:
         Parameters:
             count (int): The amount of comments you want returned.
             cursor (int): The the offset of comments from 0 you want to get.
+            prefetch (int): The amount of pages fetched ahead while you consume the current one, 0 to disable.
+            shards (int): Fetch this many ranges of offsets in parallel on different sessions.
+            ordered (bool): With shards, False yields comments as they arrive instead of in order.
+            since (datetime | float): Only get comments posted at or after this datetime or unix timestamp.
+            until (datetime | float): Only get comments posted before this datetime or unix timestamp.
+            stop (Callable[[dict], bool]): Called with the raw data of each comment, stops before the first one it returns True for.
 
         Returns:
             async iterator/generator: Yields TikTokApi.comment objects.
@@ -252,34 +310,17 @@ class Video:
                 # do something
         ```
         """
-        found = 0
-        while found < count:
-            params = {
-                "aweme_id": self.id,
-                "count": 20,
-                "cursor": cursor,
-            }
-
-            resp = await self.parent.make_request(
-                url="https://www.tiktok.com/api/comment/list/",
-                params=params,
-                headers=kwargs.get("headers"),
-                session_index=kwargs.get("session_index"),
-            )
-
-            if resp is None:
-                raise InvalidResponseException(
-                    resp, "TikTok returned an invalid response."
-                )
-
-            for video in resp.get("comments", []):
-                yield self.parent.comment(data=video)
-                found += 1
-
-            if not resp.get("has_more", False):
-                return
-
-            cursor = resp.get("cursor")
+        pages = paginate_sharded if kwargs.get("shards") else paginate
+        async for comment in pages(
+            self.parent,
+            "https://www.tiktok.com/api/comment/list/",
+            {"aweme_id": self.id},
+            "comments",
+            count,
+            cursor,
+            **kwargs,
+        ):
+            yield self.parent.comment(data=comment)
 
     async def related_videos(
         self, count: int = 30, cursor: int = 0, **kwargs
@@ -290,6 +331,9 @@ class Video:
         Parameters:
             count (int): The amount of comments you want returned.
             cursor (int): The the offset of comments from 0 you want to get.
+            since (datetime | float): Only get videos posted at or after this datetime or unix timestamp.
+            until (datetime | float): Only get videos posted before this datetime or unix timestamp.
+            stop (Callable[[dict], bool]): Called with the raw data of each video, stops before the first one it returns True for.
 
         Returns:
             async iterator/generator: Yields TikTokApi.video objects.
@@ -301,28 +345,17 @@ class Video:
                 # do something
         ```
         """
-        found = 0
-        while found < count:
-            params = {
-                "itemID": self.id,
-                "count": 16,
-            }
-
-            resp = await self.parent.make_request(
-                url="https://www.tiktok.com/api/related/item_list/",
-                params=params,
-                headers=kwargs.get("headers"),
-                session_index=kwargs.get("session_index"),
-            )
-
-            if resp is None:
-                raise InvalidResponseException(
-                    resp, "TikTok returned an invalid response."
-                )
-
-            for video in resp.get("itemList", []):
-                yield self.parent.video(data=video)
-                found += 1
+        async for video in paginate(
+            self.parent,
+            "https://www.tiktok.com/api/related/item_list/",
+            {"itemID": self.id},
+            "itemList",
+            count,
+            cursor,
+            cursor_param=None,
+            **kwargs,
+        ):
+            yield self.parent.video(data=video)
 
     def __repr__(self):
         return self.__str__()
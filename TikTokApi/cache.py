@@ -0,0 +1,229 @@
+import collections
+import dataclasses
+import hashlib
+import json
+import os
+import time
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+# Detail endpoints change slowly, so they're cached by default
+DEFAULT_TTLS = {
+    "/api/user/detail/": 10 * 60,
+    "/api/challenge/detail/": 10 * 60,
+    "/api/music/detail/": 10 * 60,
+}
+
+
+@dataclasses.dataclass
+class CacheStats:
+    """Hit and miss statistics of a ResponseCache"""
+
+    hits: int = 0
+    """Lookups answered with a fresh response."""
+    stale_hits: int = 0
+    """Lookups answered with a stale response while it's refreshed in the background."""
+    misses: int = 0
+    """Lookups that had to make the request."""
+    disk_hits: int = 0
+    """Hits, fresh or stale, that were read from the disk tier."""
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups answered from the cache"""
+        total = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / total if total > 0 else 0.0
+
+
+class MemoryCache:
+    """A least recently used in memory store with a bound on the amount of entries"""
+
+    def __init__(self, max_entries: int = 1000):
+        """
+        Create a MemoryCache.
+
+        Args:
+            max_entries (int): The amount of entries kept, the least recently used are evicted first.
+        """
+        self.max_entries = max_entries
+        self.entries: collections.OrderedDict[str, dict] = collections.OrderedDict()
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: dict):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def delete(self, key: str):
+        self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class DiskCache:
+    """A store that keeps each entry as a json file in a directory, so it's shared between runs and processes"""
+
+    def __init__(self, path: str):
+        """
+        Create a DiskCache.
+
+        Args:
+            path (str): The directory the entries are saved in, it's created if it doesn't exist.
+        """
+        self.path = path
+
+    def _filename(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, f"{digest}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._filename(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Guard against hash collisions
+        return entry if entry.get("key") == key else None
+
+    def set(self, key: str, entry: dict):
+        os.makedirs(self.path, exist_ok=True)
+        filename = self._filename(key)
+        # Write then rename so a reader never sees a half written entry
+        with open(filename + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({**entry, "key": key}, f)
+        os.replace(filename + ".tmp", filename)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._filename(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        if not os.path.isdir(self.path):
+            return
+        for filename in os.listdir(self.path):
+            if filename.endswith(".json"):
+                os.remove(os.path.join(self.path, filename))
+
+
+class ResponseCache:
+    """
+    Caches TikTok's responses for make_request with a time to live per endpoint.
+
+    Responses are kept in an in memory LRU and optionally on disk. Once an
+    entry's ttl passes it's stale, for stale_while_revalidate more seconds it
+    is still returned while it's refreshed in the background. Only endpoints
+    with a ttl are cached, and only responses with a status_code of 0.
+
+    Keys are built from the url and the params that change the response, so
+    the msToken, device_id and other session fingerprint params don't split
+    the cache between sessions.
+
+    Example Usage:
+        .. code-block:: python
+
+            from TikTokApi import TikTokApi
+            from TikTokApi.cache import ResponseCache
+
+            cache = ResponseCache(ttls={"/api/user/detail/": 3600}, path=".tiktok_cache")
+            async with TikTokApi(cache=cache) as api:
+                ...
+                print(cache.stats.hit_rate)
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[dict[str, float]] = None,
+        default_ttl: Optional[float] = None,
+        max_entries: int = 1000,
+        path: Optional[str] = None,
+        stale_while_revalidate: float = 60,
+    ):
+        """
+        Create a ResponseCache.
+
+        Args:
+            ttls (dict[str, float]): The time to live in seconds keyed by url path, defaults to DEFAULT_TTLS for the detail endpoints.
+            default_ttl (float): The time to live of endpoints not in ttls, None to not cache them.
+            max_entries (int): The amount of responses kept in memory.
+            path (str): A directory to also keep responses in, None to only cache in memory.
+            stale_while_revalidate (float): How long in seconds after expiring a response is still returned while it's refreshed.
+        """
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.memory = MemoryCache(max_entries)
+        self.disk = DiskCache(path) if path is not None else None
+        self.stats = CacheStats()
+        self.revalidating = set()
+
+    def ttl_for(self, url: str) -> Optional[float]:
+        """The time to live of responses from url, None if they aren't cached"""
+        return self.ttls.get(urlparse(url).path, self.default_ttl)
+
+    def get(self, key: str) -> Optional[tuple[Any, bool]]:
+        """
+        Look up a response.
+
+        Args:
+            key (str): The request's key, see helpers.request_key.
+
+        Returns:
+            tuple[any, bool]: The response and whether it's still fresh, or None if there's no usable response.
+        """
+        now = time.time()
+        entry = self.memory.get(key)
+        from_disk = False
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            from_disk = entry is not None
+
+        if entry is None or now >= entry["expires_at"] + self.stale_while_revalidate:
+            if entry is not None:
+                self.delete(key)
+            self.stats.misses += 1
+            return None
+
+        if from_disk:
+            self.memory.set(key, entry)
+            self.stats.disk_hits += 1
+        fresh = now < entry["expires_at"]
+        if fresh:
+            self.stats.hits += 1
+        else:
+            self.stats.stale_hits += 1
+        return entry["value"], fresh
+
+    def set(self, key: str, value: Any, ttl: float):
+        """
+        Store a response.
+
+        Args:
+            key (str): The request's key, see helpers.request_key.
+            value (any): The json response, it has to be json serializable when a disk tier is used.
+            ttl (float): How long in seconds the response is fresh for.
+        """
+        entry = {"value": value, "expires_at": time.time() + ttl}
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry)
+
+    def delete(self, key: str):
+        """Remove a response from every tier"""
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        """Remove every response from every tier"""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
@@ -0,0 +1,206 @@
+import asyncio
+import contextlib
+import time
+from typing import Hashable, Optional
+
+
+class AdaptiveLimit:
+    """
+    A concurrency limit that adapts with additive increase, multiplicative decrease (AIMD).
+
+    Every success raises the limit by increase / limit, so a full window of
+    successes raises it by increase. Every failure multiplies it by decrease.
+    Successes slower than max_latency hold the limit where it is.
+    """
+
+    def __init__(
+        self,
+        initial: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        increase: float = 1,
+        decrease: float = 0.5,
+        max_latency: Optional[float] = None,
+    ):
+        """
+        Create an AdaptiveLimit.
+
+        Args:
+            initial (float): The limit to start at.
+            min_limit (float): The lowest the limit is cut to.
+            max_limit (float): The highest the limit is raised to.
+            increase (float): How much a full window of successes raises the limit.
+            decrease (float): The factor a failure multiplies the limit by.
+            max_latency (float): Successes slower than this many seconds don't raise the limit, None to ignore latency.
+        """
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.max_latency = max_latency
+        self.in_flight = 0
+        self._condition = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        # Created lazily so the limit can be built outside of a running event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        """Wait until the amount of requests in flight is below the limit and take a slot"""
+        async with self.condition:
+            while self.in_flight >= max(1, int(self.limit)):
+                await self.condition.wait()
+            self.in_flight += 1
+
+    async def release(self, success: Optional[bool], latency: float):
+        """
+        Give back a slot and adapt the limit.
+
+        Args:
+            success (bool): Whether the request succeeded, None if it ended without an outcome (eg. it was cancelled).
+            latency (float): How long the request took in seconds.
+        """
+        if success:
+            if self.max_latency is None or latency <= self.max_latency:
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+        elif success is not None:
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Finds the highest sustainable concurrency per endpoint and per proxy.
+
+    Each endpoint and each proxy gets its own :class:`AdaptiveLimit`, a
+    request takes a slot in both. Empty responses, invalid JSON, captchas,
+    timeouts and non-zero status codes cut the limits, healthy responses
+    slowly raise them.
+
+    Example Usage:
+        .. code-block:: python
+
+            from TikTokApi import TikTokApi
+            from TikTokApi.concurrency import AdaptiveConcurrencyLimiter
+
+            limiter = AdaptiveConcurrencyLimiter(initial=4, max_limit=32, max_latency=2)
+            async with TikTokApi(concurrency_limiter=limiter) as api:
+                ...
+    """
+
+    def __init__(
+        self,
+        initial: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        increase: float = 1,
+        decrease: float = 0.5,
+        max_latency: Optional[float] = None,
+    ):
+        """
+        Create an AdaptiveConcurrencyLimiter, the arguments are used for every limit it creates.
+
+        Args:
+            initial (float): The limit each endpoint and proxy starts at.
+            min_limit (float): The lowest a limit is cut to.
+            max_limit (float): The highest a limit is raised to.
+            increase (float): How much a full window of successes raises a limit.
+            decrease (float): The factor a failure multiplies a limit by.
+            max_latency (float): Successes slower than this many seconds don't raise a limit, None to ignore latency.
+        """
+        self.options = {
+            "initial": initial,
+            "min_limit": min_limit,
+            "max_limit": max_limit,
+            "increase": increase,
+            "decrease": decrease,
+            "max_latency": max_latency,
+        }
+        self.endpoint_limits: dict[str, AdaptiveLimit] = {}
+        self.proxy_limits: dict[Hashable, AdaptiveLimit] = {}
+
+    def _get_limit(self, limits: dict, key: Hashable) -> AdaptiveLimit:
+        limit = limits.get(key)
+        if limit is None:
+            limit = AdaptiveLimit(**self.options)
+            limits[key] = limit
+        return limit
+
+    @staticmethod
+    @contextlib.asynccontextmanager
+    async def _hold(limit: AdaptiveLimit):
+        """Hold a slot of a single limit, the request counts as failed if the block raises, except when it's cancelled"""
+        await limit.acquire()
+        start = time.monotonic()
+        success = None
+        try:
+            yield
+            success = True
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            success = False
+            raise
+        finally:
+            await limit.release(success, time.monotonic() - start)
+
+    def endpoint_slot(self, endpoint: str):
+        """
+        Hold a slot for an endpoint for the duration of a request.
+
+        Take it before leasing a session, so requests queued at one
+        endpoint's limit don't hold sessions other endpoints could use.
+
+        Args:
+            endpoint (str): The url path of the request, eg. "/api/post/item_list/".
+        """
+        return self._hold(self._get_limit(self.endpoint_limits, endpoint))
+
+    def proxy_slot(self, proxy: Hashable = None):
+        """
+        Hold a slot for a proxy for the duration of a request, once the session and so its proxy is known.
+
+        Args:
+            proxy (Hashable): A key identifying the proxy the request goes through, None for direct connections.
+        """
+        return self._hold(self._get_limit(self.proxy_limits, proxy))
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, endpoint: str, proxy: Hashable = None):
+        """
+        Hold a slot for endpoint and proxy for the duration of a request.
+
+        The request counts as failed if the block raises, except when it's cancelled.
+
+        Args:
+            endpoint (str): The url path of the request, eg. "/api/post/item_list/".
+            proxy (Hashable): A key identifying the proxy the request goes through, None for direct connections.
+        """
+        async with self.endpoint_slot(endpoint):
+            async with self.proxy_slot(proxy):
+                yield
+
+    def snapshot(self) -> dict:
+        """
+        Get the current limits.
+
+        Returns:
+            dict: The limit and amount of requests in flight for each endpoint and proxy.
+        """
+        return {
+            "endpoints": {
+                key: {"limit": limit.limit, "in_flight": limit.in_flight}
+                for key, limit in self.endpoint_limits.items()
+            },
+            "proxies": {
+                key: {"limit": limit.limit, "in_flight": limit.in_flight}
+                for key, limit in self.proxy_limits.items()
+            },
+        }
@@ -33,3 +33,7 @@ class InvalidJSONException(TikTokException):
 
 class InvalidResponseException(TikTokException):
     """The response from TikTok was invalid."""
+
+
+class TimeoutException(TikTokException):
+    """The request to TikTok timed out or ran past its deadline."""
@@ -0,0 +1,160 @@
+import asyncio
+import collections
+import math
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+
+class LatencyTracker:
+    """
+    Keeps the latencies of the most recent requests to each endpoint.
+
+    Percentiles are computed over a sliding window so they follow TikTok's
+    latency as it changes during the day.
+    """
+
+    def __init__(self, window: int = 200):
+        """
+        Create a LatencyTracker.
+
+        Args:
+            window (int): The amount of recent latencies kept per endpoint.
+        """
+        self.window = window
+        self.latencies: dict[str, collections.deque] = {}
+
+    def record(self, endpoint: str, latency: float):
+        """Record the latency in seconds of a finished request"""
+        latencies = self.latencies.get(endpoint)
+        if latencies is None:
+            latencies = collections.deque(maxlen=self.window)
+            self.latencies[endpoint] = latencies
+        latencies.append(latency)
+
+    def count(self, endpoint: str) -> int:
+        """The amount of latencies recorded for an endpoint"""
+        return len(self.latencies.get(endpoint, ()))
+
+    def percentile(self, endpoint: str, q: float) -> Optional[float]:
+        """
+        Get a percentile of an endpoint's recent latencies.
+
+        Args:
+            endpoint (str): The endpoint, eg. "/api/user/detail/".
+            q (float): The percentile between 0 and 1, eg. 0.95.
+
+        Returns:
+            float: The latency in seconds, or None if nothing was recorded yet.
+        """
+        latencies = self.latencies.get(endpoint)
+        if not latencies:
+            return None
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+class HedgePolicy:
+    """
+    Sends a duplicate of a slow request to another session, keeping whichever answers first.
+
+    A request that is still running once it passes the observed percentile
+    latency of its endpoint is hedged, the loser is cancelled. Hedges are
+    limited to budget of all requests so a slow TikTok doesn't turn into
+    twice the load.
+
+    Example Usage:
+        .. code-block:: python
+
+            from TikTokApi import TikTokApi
+            from TikTokApi.hedging import HedgePolicy
+
+            async with TikTokApi(hedge_policy=HedgePolicy(percentile=0.95, budget=0.05)) as api:
+                ...
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        budget: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        min_delay: float = 0.05,
+    ):
+        """
+        Create a HedgePolicy.
+
+        Args:
+            percentile (float): The latency percentile of an endpoint after which a request is hedged.
+            budget (float): The maximum amount of hedges as a fraction of all requests, eg. 0.05 for 5% extra requests.
+            min_samples (int): The amount of latencies an endpoint needs before its requests are hedged.
+            window (int): The amount of recent latencies kept per endpoint.
+            min_delay (float): The shortest time in seconds to wait before hedging.
+        """
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.tracker = LatencyTracker(window)
+        self.requests = 0
+        """The amount of requests run through the policy."""
+        self.hedges = 0
+        """The amount of hedges sent."""
+        self.hedge_wins = 0
+        """The amount of hedges that answered before the original request."""
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        """How long in seconds to wait before hedging a request to endpoint, None to not hedge it"""
+        if self.tracker.count(endpoint) < self.min_samples:
+            return None
+        return max(self.min_delay, self.tracker.percentile(endpoint, self.percentile))
+
+    def _take_budget(self) -> bool:
+        if self.hedges + 1 > self.budget * self.requests:
+            return False
+        self.hedges += 1
+        return True
+
+    async def run(
+        self, endpoint: str, attempt: Callable[[int], Awaitable[Any]]
+    ) -> Any:
+        """
+        Run a request, hedging it if it's slow.
+
+        Args:
+            endpoint (str): The endpoint the request is for, latencies are tracked per endpoint.
+            attempt (Callable[[int], Awaitable]): Starts a copy of the request, called with 0 for the original and 1 for the hedge.
+
+        Returns:
+            any: The result of the first copy that succeeded.
+
+        Raises:
+            Exception: The error of the original request if every copy failed.
+        """
+        self.requests += 1
+        start = time.monotonic()
+        tasks = [asyncio.ensure_future(attempt(0))]
+        try:
+            delay = self.delay(endpoint)
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if len(done) == 0 and self._take_budget():
+                    tasks.append(asyncio.ensure_future(attempt(1)))
+
+            pending = set(tasks)
+            errors = {}
+            while len(pending) > 0:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self.tracker.record(endpoint, time.monotonic() - start)
+                        if task is not tasks[0]:
+                            self.hedge_wins += 1
+                        return task.result()
+                    errors[task] = task.exception()
+            raise errors.get(tasks[0], next(iter(errors.values())))
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
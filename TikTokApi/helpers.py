@@ -22,3 +22,61 @@ def random_choice(choices: list):
     if choices is None or len(choices) == 0:
         return None
     return random.choice(choices)
+
+
+def proxy_url(proxy) -> str:
+    """Convert a playwright proxy setting into a proxy url, urls are returned unchanged"""
+    if proxy is None or isinstance(proxy, str):
+        return proxy
+
+    server = proxy["server"]
+    if "://" not in server:
+        server = f"http://{server}"
+    if proxy.get("username"):
+        scheme, host = server.split("://", 1)
+        credentials = proxy["username"]
+        if proxy.get("password"):
+            credentials += f":{proxy['password']}"
+        server = f"{scheme}://{credentials}@{host}"
+    return server
+
+
+def requests_proxies(proxy) -> dict:
+    """Convert a playwright proxy setting or proxy url into the proxies argument of requests"""
+    if proxy is None:
+        return None
+    if isinstance(proxy, dict) and "server" not in proxy:
+        # already in the requests format
+        return proxy
+    url = proxy_url(proxy)
+    return {"http": url, "https": url}
+
+
+# Params that differ between sessions or requests without changing what TikTok returns
+VOLATILE_PARAMS = frozenset(
+    {
+        "msToken",
+        "X-Bogus",
+        "_signature",
+        "device_id",
+        "odinId",
+        "verifyFp",
+        "history_len",
+        "screen_height",
+        "screen_width",
+        "browser_version",
+        "browser_platform",
+        "os",
+        "tz_name",
+    }
+)
+
+
+def request_key(url: str, params: dict = None) -> str:
+    """Identify a request by its url and the params that change its response"""
+    stable = sorted(
+        (k, str(v))
+        for k, v in (params or {}).items()
+        if k not in VOLATILE_PARAMS and v is not None
+    )
+    return url + "?" + "&".join(f"{k}={v}" for k, v in stable)
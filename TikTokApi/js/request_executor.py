@@ -0,0 +1,81 @@
+request_executor = """
+(() => {
+    if (window.__tiktokApi !== undefined) {
+        return;
+    }
+
+    // Appends the X-Bogus signature generated by TikTok's own signer to a url
+    const sign = (url) => {
+        const xBogus = (window.byted_acrawler.frontierSign(url) || {})["X-Bogus"];
+        if (!xBogus) {
+            throw new Error("Failed to generate X-Bogus");
+        }
+        return url + (url.includes("?") ? "&" : "?") + "X-Bogus=" + xBogus;
+    };
+
+    // AbortControllers of running requests by id, so python can cancel them
+    const controllers = new Map();
+
+    // Signs and fetches a url, resolving to the response body as text.
+    // The fetch is aborted after timeout milliseconds, or when abort(id) is called.
+    const request = async ({ url, headers, timeout, id }) => {
+        const controller = new AbortController();
+        if (id !== undefined && id !== null) {
+            controllers.set(String(id), controller);
+        }
+        const timer = timeout ? setTimeout(() => controller.abort(), timeout) : null;
+        try {
+            const response = await fetch(sign(url), {
+                method: "GET",
+                headers: headers,
+                signal: controller.signal,
+            });
+            return await response.text();
+        } catch (error) {
+            if (error && error.name === "AbortError") {
+                throw new Error("TikTokApi request aborted, it timed out or was cancelled");
+            }
+            throw error;
+        } finally {
+            clearTimeout(timer);
+            controllers.delete(String(id));
+        }
+    };
+
+    // Aborts the request with this id, and every request of the batch with this id
+    const abort = (id) => {
+        for (const [key, controller] of controllers) {
+            if (key === String(id) || key.startsWith(id + ":")) {
+                controller.abort();
+            }
+        }
+    };
+
+    // Runs many requests with at most concurrency in flight, results keep the order of requests
+    const requestMany = async ({ requests, concurrency, timeout, id }) => {
+        const results = new Array(requests.length);
+        let next = 0;
+        const worker = async () => {
+            while (next < requests.length) {
+                const i = next++;
+                try {
+                    const itemId = id === undefined || id === null ? undefined : id + ":" + i;
+                    results[i] = {
+                        body: await request({ ...requests[i], timeout: timeout, id: itemId }),
+                    };
+                } catch (error) {
+                    results[i] = { error: String((error && error.message) || error) };
+                }
+            }
+        };
+        const workers = Math.max(1, Math.min(concurrency, requests.length));
+        await Promise.all(Array.from({ length: workers }, worker));
+        return results;
+    };
+
+    Object.defineProperty(window, "__tiktokApi", {
+        value: { sign, request, requestMany, abort },
+        enumerable: false,
+    });
+})();
+"""
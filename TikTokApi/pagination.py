@@ -0,0 +1,680 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import time
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Optional,
+    Union,
+)
+from urllib.parse import urlparse
+
+from .exceptions import InvalidResponseException
+from .session_pool import SessionAffinity
+
+if TYPE_CHECKING:
+    from .tiktok import TikTokApi
+
+# The largest page each endpoint returns, the sizes TikTok's web client asks for
+MAX_PAGE_SIZES = {
+    "/api/post/item_list/": 35,
+    "/api/favorite/item_list": 35,
+    "/api/challenge/item_list/": 35,
+    "/api/music/item_list/": 30,
+    "/api/comment/list/": 20,
+    "/api/comment/list/reply/": 20,
+    "/api/related/item_list/": 16,
+    "/api/recommend/item_list/": 30,
+}
+
+# Endpoints that return items newest first, so an item older than since ends them
+TIME_ORDERED = {"/api/post/item_list/"}
+
+
+@dataclasses.dataclass
+class Page:
+    """A single page of a paginated TikTok endpoint"""
+
+    items: list
+    """The items on the page."""
+    cursor: Any = None
+    """The cursor of the next page."""
+    has_more: bool = False
+    """Whether TikTok says there's another page."""
+
+
+_DONE = object()
+
+
+async def prefetch_pages(
+    fetch_page: Callable[[Any], Awaitable[Page]],
+    cursor: Any,
+    count: Optional[int] = None,
+    depth: int = 1,
+) -> AsyncIterator[Page]:
+    """
+    Yield pages of a cursor paginated endpoint, fetching up to depth pages ahead of the consumer.
+
+    A page is requested as soon as the previous page's cursor is known, so
+    fetching overlaps with the consumer's work on earlier pages. At most depth
+    pages are fetched or waiting before the consumer asks for them.
+
+    Args:
+        fetch_page (Callable[[any], Awaitable[Page]]): Fetches the page at a cursor.
+        cursor (any): The cursor of the first page.
+        count (int): Stop fetching once this many items have been fetched, None to fetch until TikTok has no more.
+        depth (int): The amount of pages fetched ahead of the consumer, 0 fetches each page only when it's needed.
+
+    Returns:
+        async iterator/generator: Yields each Page in order.
+    """
+    if depth <= 0:
+        found = 0
+        while count is None or found < count:
+            page = await fetch_page(cursor)
+            found += len(page.items)
+            yield page
+            if not page.has_more:
+                return
+            cursor = page.cursor
+        return
+
+    queue = asyncio.Queue()
+    # A slot is taken before a page is fetched and given back once the consumer takes the page
+    slots = asyncio.Semaphore(depth)
+
+    async def produce():
+        nonlocal cursor
+        found = 0
+        try:
+            while count is None or found < count:
+                await slots.acquire()
+                page = await fetch_page(cursor)
+                found += len(page.items)
+                queue.put_nowait(page)
+                if not page.has_more:
+                    break
+                cursor = page.cursor
+        except Exception as e:
+            queue.put_nowait(e)
+            return
+        queue.put_nowait(_DONE)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            page = await queue.get()
+            if page is _DONE:
+                return
+            if isinstance(page, Exception):
+                raise page
+            slots.release()
+            yield page
+    finally:
+        # The consumer may stop early, don't keep fetching pages nobody reads
+        producer.cancel()
+
+
+async def _request_page(
+    api: TikTokApi,
+    url: str,
+    params: dict,
+    cursor: Any,
+    cursor_param: Optional[str],
+    size: Optional[int],
+    count_param: Optional[str],
+    affinity: SessionAffinity,
+    kwargs: dict,
+) -> dict:
+    """Request one page of an endpoint, raising if TikTok's response is invalid"""
+    page_params = dict(params)
+    if cursor_param is not None:
+        page_params[cursor_param] = cursor
+    if count_param is not None and size is not None:
+        page_params[count_param] = size
+
+    resp = await api.make_request(
+        url=url,
+        params=page_params,
+        headers=kwargs.get("headers"),
+        session_index=kwargs.get("session_index"),
+        timeout=kwargs.get("timeout"),
+        deadline=kwargs.get("deadline"),
+        affinity=affinity,
+    )
+
+    if resp is None:
+        raise InvalidResponseException(resp, "TikTok returned an invalid response.")
+    return resp
+
+
+def item_id(item: dict) -> Any:
+    """The id TikTok gives an item, used to spot items that were already returned"""
+    for key in ("id", "cid"):
+        if key in item:
+            return item[key]
+    user_info = item.get("user_info")
+    if isinstance(user_info, dict):
+        return user_info.get("user_id")
+    return None
+
+
+def is_pinned(item: dict) -> bool:
+    """Whether an item is pinned to the top of a user's feed, out of time order"""
+    return bool(item.get("isPinnedItem"))
+
+
+def created_at(item: dict) -> int:
+    """When an item was posted as a unix timestamp in milliseconds, the unit of post/item_list's cursor, 0 if unknown"""
+    return int(item.get("createTime") or item.get("create_time") or 0) * 1000
+
+
+def _timestamp_ms(value: Union[datetime, float, None]) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.timestamp()
+    return int(value * 1000)
+
+
+class StopConditions:
+    """
+    The since, until and stop kwargs of an iterator, applied to each page as it's fetched.
+
+    Items posted before since or at or after until are dropped, and the
+    feed ends at the first item stop returns True for. On endpoints in
+    TIME_ORDERED the feed also ends at the first item older than since,
+    pinned posts aside, as every item after it is older too.
+    """
+
+    def __init__(
+        self,
+        since: Union[datetime, float, None] = None,
+        until: Union[datetime, float, None] = None,
+        stop: Optional[Callable[[dict], bool]] = None,
+        time_ordered: bool = False,
+    ):
+        """
+        Create StopConditions.
+
+        Args:
+            since (datetime | float): Only keep items posted at or after this datetime or unix timestamp.
+            until (datetime | float): Only keep items posted before this datetime or unix timestamp.
+            stop (Callable[[dict], bool]): Called with the raw data of each item, the feed ends before the first item it returns True for.
+            time_ordered (bool): Whether the endpoint returns items newest first.
+        """
+        self.since = _timestamp_ms(since)
+        self.until = _timestamp_ms(until)
+        self.stop = stop
+        self.time_ordered = time_ordered
+
+    @classmethod
+    def from_kwargs(cls, url: str, kwargs: dict) -> StopConditions:
+        """Build the conditions from an iterator's kwargs"""
+        return cls(
+            since=kwargs.get("since"),
+            until=kwargs.get("until"),
+            stop=kwargs.get("stop"),
+            time_ordered=urlparse(url).path in TIME_ORDERED,
+        )
+
+    def apply(self, items: list) -> tuple[list, bool]:
+        """
+        Filter a page of items.
+
+        Args:
+            items (list): The raw data of the page's items, in the order they're yielded.
+
+        Returns:
+            tuple[list, bool]: The items to yield, and whether the feed ends after them.
+        """
+        kept = []
+        for item in items:
+            if self.stop is not None and self.stop(item):
+                return kept, True
+            created = created_at(item)
+            if created == 0:
+                # Items without a time, eg. users, can't be filtered by it
+                kept.append(item)
+                continue
+            if self.since is not None and created < self.since:
+                if self.time_ordered and not is_pinned(item):
+                    return kept, True
+                continue
+            if self.until is not None and created >= self.until:
+                continue
+            kept.append(item)
+        return kept, False
+
+
+async def paginate(
+    api: TikTokApi,
+    url: str,
+    params: dict,
+    items_key: str,
+    count: int,
+    cursor: Any = 0,
+    cursor_param: Optional[str] = "cursor",
+    count_param: Optional[str] = "count",
+    page_size: Optional[int] = None,
+    **kwargs,
+) -> AsyncIterator[dict]:
+    """
+    Page through a TikTok endpoint, the pagination engine every iterator in TikTokApi.api uses.
+
+    Pages are requested at the largest size the endpoint returns, or the
+    amount still needed if that's smaller, and the last page is trimmed so
+    exactly count items are yielded. Items that were already returned are
+    dropped, and pagination stops at a page that's empty or only repeats
+    earlier items, even if TikTok says there's more. The pagination is pinned
+    to a session and the next page is prefetched while the current one is
+    consumed.
+
+    Args:
+        api (TikTokApi): The api to make the requests with.
+        url (str): The endpoint's url.
+        params (dict): The endpoint's params, without the cursor and page size.
+        items_key (str): The key of the list of items in each response.
+        count (int): The amount of items to yield.
+        cursor (any): The cursor of the first page.
+        cursor_param (str): The param the cursor is sent as, None for endpoints without a cursor.
+        count_param (str): The param the page size is sent as, None for endpoints without a page size.
+        page_size (int): The page size to ask for, defaults to the endpoint's entry in MAX_PAGE_SIZES.
+        prefetch (int): The amount of pages fetched ahead of the consumer, defaults to 1.
+        since, until, stop: Conditions that filter the items and end the feed early, see StopConditions.
+        headers, session_index, timeout, deadline: Passed through to make_request.
+
+    Returns:
+        async iterator/generator: Yields the raw data of each item.
+
+    Raises:
+        InvalidResponseException: If TikTok returns an invalid response.
+    """
+    path = urlparse(url).path
+    page_size = page_size or MAX_PAGE_SIZES.get(path)
+    conditions = StopConditions.from_kwargs(url, kwargs)
+    if conditions.time_ordered and conditions.until is not None and not cursor:
+        # The cursor is a timestamp, start the feed at until instead of now
+        cursor = conditions.until
+    affinity = SessionAffinity()
+    seen = set()
+    fetched = 0
+
+    async def fetch_page(cursor):
+        nonlocal fetched
+        size = None if page_size is None else min(page_size, count - fetched)
+        resp = await _request_page(
+            api, url, params, cursor, cursor_param, size, count_param, affinity, kwargs
+        )
+
+        items = []
+        for item in resp.get(items_key) or []:
+            key = item_id(item)
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            items.append(item)
+
+        has_more = bool(resp.get("hasMore", resp.get("has_more", False)))
+        if has_more and len(items) == 0:
+            api.logger.info(f"{path} returned an empty or repeated page, stopping")
+            has_more = False
+        items, stopped = conditions.apply(items)
+        if stopped:
+            has_more = False
+        fetched += len(items)
+        return Page(items, cursor=resp.get("cursor"), has_more=has_more)
+
+    found = 0
+    pages = prefetch_pages(fetch_page, cursor, count, depth=kwargs.get("prefetch", 1))
+    try:
+        async for page in pages:
+            for item in page.items:
+                yield item
+                found += 1
+                if found >= count:
+                    return
+    finally:
+        await pages.aclose()
+        affinity.release()
+
+
+async def paginate_sharded(
+    api: TikTokApi,
+    url: str,
+    params: dict,
+    items_key: str,
+    count: int,
+    cursor: int = 0,
+    shards: int = 4,
+    ordered: bool = True,
+    page_size: Optional[int] = None,
+    **kwargs,
+) -> AsyncIterator[dict]:
+    """
+    Page through an offset cursor endpoint with several ranges of offsets fetched in parallel.
+
+    Endpoints like challenge/item_list, music/item_list and comment/list
+    take the offset of the first item as their cursor, so the offsets from
+    cursor to cursor + count are split into shards ranges of whole pages.
+    Each shard pages through its range on its own pinned session, all shards
+    run at once. Items are yielded in offset order, or as soon as any shard
+    returns them when ordered is False, with duplicates at the shard edges
+    dropped. Once a shard reaches the end of the feed the shards after it
+    are cancelled.
+
+    Args:
+        api (TikTokApi): The api to make the requests with.
+        url (str): The endpoint's url.
+        params (dict): The endpoint's params, without the cursor and page size.
+        items_key (str): The key of the list of items in each response.
+        count (int): The amount of items to yield.
+        cursor (int): The offset of the first item.
+        shards (int): The amount of ranges fetched in parallel.
+        ordered (bool): Whether to yield items in offset order, False yields them as they arrive.
+        page_size (int): The page size to ask for, defaults to the endpoint's entry in MAX_PAGE_SIZES.
+        since, until, stop: Conditions that filter the items and end the feed early, see StopConditions.
+        headers, session_index, timeout, deadline: Passed through to make_request.
+
+    Returns:
+        async iterator/generator: Yields the raw data of each item.
+
+    Raises:
+        InvalidResponseException: If TikTok returns an invalid response.
+    """
+    path = urlparse(url).path
+    page_size = page_size or MAX_PAGE_SIZES.get(path) or 30
+    cursor = int(cursor)
+    end = cursor + count
+
+    # Shards cover whole pages so their edges line up with the pages TikTok serves
+    pages = -(-count // page_size)
+    shards = max(1, min(shards, pages))
+    starts = [cursor + pages * i // shards * page_size for i in range(shards)]
+    bounds = list(zip(starts, starts[1:] + [end]))
+
+    conditions = StopConditions.from_kwargs(url, kwargs)
+    queues = [asyncio.Queue() for _ in bounds]
+    merged = asyncio.Queue()
+    tasks = []
+    last_shard = len(bounds) - 1
+
+    def end_of_feed(index):
+        nonlocal last_shard
+        if index < last_shard:
+            last_shard = index
+            for task in tasks[index + 1 :]:
+                task.cancel()
+
+    async def run_shard(index, start, stop):
+        queue = queues[index] if ordered else merged
+        affinity = SessionAffinity()
+        offset = start
+        try:
+            while offset < stop:
+                resp = await _request_page(
+                    api,
+                    url,
+                    params,
+                    offset,
+                    "cursor",
+                    min(page_size, stop - offset),
+                    "count",
+                    affinity,
+                    kwargs,
+                )
+                items = resp.get(items_key) or []
+                kept, stopped = conditions.apply(items)
+                queue.put_nowait(kept)
+
+                has_more = bool(resp.get("hasMore", resp.get("has_more", False)))
+                next_offset = int(resp.get("cursor") or offset + len(items))
+                if not has_more or len(items) == 0 or stopped:
+                    end_of_feed(index)
+                    break
+                if next_offset <= offset:
+                    break
+                offset = next_offset
+        except Exception as e:
+            queue.put_nowait(e)
+        finally:
+            affinity.release()
+
+    async def shard_items():
+        if ordered:
+            index = 0
+            while index <= last_shard:
+                items = await queues[index].get()
+                if items is _DONE:
+                    index += 1
+                    continue
+                if isinstance(items, Exception):
+                    raise items
+                yield items
+            return
+
+        running = len(tasks)
+        while running > 0:
+            items = await merged.get()
+            if items is _DONE:
+                running -= 1
+                continue
+            if isinstance(items, Exception):
+                raise items
+            yield items
+
+    for index, (start, stop) in enumerate(bounds):
+        task = asyncio.ensure_future(run_shard(index, start, stop))
+        # Marks the shard as finished even if it's cancelled before it starts
+        queue = queues[index] if ordered else merged
+        task.add_done_callback(lambda _, queue=queue: queue.put_nowait(_DONE))
+        tasks.append(task)
+
+    seen = set()
+    found = 0
+    merge = shard_items()
+    try:
+        async for items in merge:
+            for item in items:
+                key = item_id(item)
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                yield item
+                found += 1
+                if found >= count:
+                    return
+    finally:
+        await merge.aclose()
+        for task in tasks:
+            task.cancel()
+
+
+async def paginate_by_time(
+    api: TikTokApi,
+    url: str,
+    params: dict,
+    items_key: str,
+    count: int,
+    cursor: int = 0,
+    shards: int = 4,
+    window: float = 30 * 24 * 60 * 60,
+    page_size: Optional[int] = None,
+    **kwargs,
+) -> AsyncIterator[dict]:
+    """
+    Page through a timestamp cursor endpoint with several windows of time fetched in parallel.
+
+    post/item_list's cursor is a timestamp in milliseconds and each page
+    holds the posts from before it, so the feed is split into windows of
+    time going back from cursor (or now) until the first post. shards
+    workers each take the next window and page through it on their own
+    pinned session. Each window's items are sorted by createTime and
+    yielded newest first, window after window, with duplicates dropped.
+    Windows a page shows are empty are skipped without a request, so
+    gaps in a user's history cost nothing.
+
+    Args:
+        api (TikTokApi): The api to make the requests with.
+        url (str): The endpoint's url.
+        params (dict): The endpoint's params, without the cursor and page size.
+        items_key (str): The key of the list of items in each response.
+        count (int): The amount of items to yield.
+        cursor (int): The timestamp in milliseconds to yield items from before, 0 for now.
+        shards (int): The amount of windows fetched in parallel.
+        window (float): The length of each window in seconds, defaults to 30 days.
+        page_size (int): The page size to ask for, defaults to the endpoint's entry in MAX_PAGE_SIZES.
+        since, until, stop: Conditions that filter the items and end the feed early, see StopConditions.
+        headers, session_index, timeout, deadline: Passed through to make_request.
+
+    Returns:
+        async iterator/generator: Yields the raw data of each item.
+
+    Raises:
+        InvalidResponseException: If TikTok returns an invalid response.
+    """
+    path = urlparse(url).path
+    page_size = page_size or MAX_PAGE_SIZES.get(path) or 30
+    conditions = StopConditions.from_kwargs(url, kwargs)
+    upper = int(cursor) or conditions.until or int(time.time() * 1000)
+    window_ms = int(window * 1000)
+
+    def window_of(created):
+        return (upper - created - 1) // window_ms
+
+    loop = asyncio.get_running_loop()
+    results: dict[int, asyncio.Future] = {}
+    next_window = 0
+    # The window holding the first post, once a page says there's nothing older,
+    # or the window holding since
+    last_window = None
+    if conditions.since is not None:
+        last_window = window_of(conditions.since)
+    # Windows before this one that a page showed are empty
+    skip_until = 0
+    fetched = 0
+
+    def result(index):
+        if index not in results:
+            results[index] = loop.create_future()
+        return results[index]
+
+    async def run_window(index, affinity):
+        nonlocal last_window, skip_until
+        top = upper - index * window_ms
+        bottom = top - window_ms
+        page_cursor = top
+        items = []
+        # Pinned posts repeat on every page, so dedupe before they're counted
+        window_seen = set()
+        while True:
+            resp = await _request_page(
+                api,
+                url,
+                params,
+                page_cursor,
+                "cursor",
+                page_size,
+                "count",
+                affinity,
+                kwargs,
+            )
+            page = resp.get(items_key) or []
+            for item in page:
+                if not bottom <= created_at(item) < top:
+                    continue
+                key = item_id(item)
+                if key is not None:
+                    if key in window_seen:
+                        continue
+                    window_seen.add(key)
+                items.append(item)
+
+            # Pinned posts are out of time order, they'd cut the window short
+            times = [created_at(item) for item in page if not is_pinned(item)]
+            if len(times) > 0 and min(times) < bottom:
+                skip_until = max(skip_until, window_of(max(times)))
+
+            has_more = bool(resp.get("hasMore", resp.get("has_more", False)))
+            if not has_more or len(times) == 0:
+                end = window_of(min(times)) if len(times) > 0 else index
+                last_window = end if last_window is None else min(last_window, end)
+                return items
+            if min(times) < bottom:
+                return items
+
+            next_cursor = int(resp.get("cursor") or min(times))
+            if next_cursor >= page_cursor:
+                return items
+            page_cursor = next_cursor
+
+    async def worker():
+        nonlocal next_window, fetched
+        affinity = SessionAffinity()
+        try:
+            # The started windows hold every item newer than the next one, so
+            # once they've count items no older window is needed
+            while fetched < count and (
+                last_window is None or next_window <= last_window
+            ):
+                index = next_window
+                next_window += 1
+                if index < skip_until:
+                    result(index).set_result([])
+                    continue
+                try:
+                    items = await run_window(index, affinity)
+                except Exception as e:
+                    result(index).set_exception(e)
+                    return
+                fetched += len(items)
+                result(index).set_result(items)
+        finally:
+            affinity.release()
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(max(1, shards))]
+    seen = set()
+    found = 0
+    index = 0
+    try:
+        while last_window is None or index <= last_window:
+            future = result(index)
+            if not future.done() and all(w.done() for w in workers):
+                # Every worker stopped, so nothing older is needed
+                return
+            await asyncio.wait(
+                [future, *[w for w in workers if not w.done()]],
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not future.done():
+                continue
+            items = sorted(future.result(), key=created_at, reverse=True)
+            items, stopped = conditions.apply(items)
+            for item in items:
+                key = item_id(item)
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                yield item
+                found += 1
+                if found >= count:
+                    return
+            if stopped:
+                return
+            index += 1
+    finally:
+        for worker_task in workers:
+            worker_task.cancel()
+        for future in results.values():
+            if future.done() and not future.cancelled():
+                # Mark errors nobody reached as retrieved
+                future.exception()
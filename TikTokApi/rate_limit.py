@@ -0,0 +1,149 @@
+import asyncio
+import time
+from typing import Hashable, Optional, Union
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """
+    An async token bucket.
+
+    Tokens refill continuously at rate per second up to burst. Callers that
+    find the bucket empty wait in FIFO order rather than failing.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Create a TokenBucket.
+
+        Args:
+            rate (float): The amount of tokens added per second.
+            burst (float): The maximum amount of tokens the bucket holds, defaults to max(1, rate).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # Created lazily so the bucket can be built outside of a running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: float = 1):
+        """Wait until the requested amount of tokens is available and take them"""
+        async with self.lock:
+            self._refill()
+            while self.tokens < tokens:
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
+
+
+Rate = Union[float, tuple]
+
+
+def _bucket(rate: Rate) -> TokenBucket:
+    if isinstance(rate, tuple):
+        return TokenBucket(*rate)
+    return TokenBucket(rate)
+
+
+class RateLimiter:
+    """
+    Limits the rate of requests made to TikTok globally, per session and per endpoint.
+
+    Each rate is given in requests per second, either as a number or as a
+    (rate, burst) tuple. Any limit left as None is not applied.
+
+    Example Usage:
+        .. code-block:: python
+
+            from TikTokApi import TikTokApi
+            from TikTokApi.rate_limit import RateLimiter
+
+            limiter = RateLimiter(
+                global_rate=10,
+                session_rate=(1, 3),
+                endpoint_rates={"/api/comment/list/": 2},
+            )
+            async with TikTokApi(rate_limiter=limiter) as api:
+                ...
+    """
+
+    def __init__(
+        self,
+        global_rate: Optional[Rate] = None,
+        session_rate: Optional[Rate] = None,
+        endpoint_rates: Optional[dict[str, Rate]] = None,
+    ):
+        """
+        Create a RateLimiter.
+
+        Args:
+            global_rate (float | tuple): The rate shared by every request.
+            session_rate (float | tuple): The rate applied to each session separately.
+            endpoint_rates (dict[str, float | tuple]): Rates keyed by url path, eg. "/api/post/item_list/".
+        """
+        self.global_bucket = _bucket(global_rate) if global_rate is not None else None
+        self.session_rate = session_rate
+        self.session_buckets: dict[Hashable, TokenBucket] = {}
+        self.endpoint_buckets = {
+            path: _bucket(rate) for path, rate in (endpoint_rates or {}).items()
+        }
+
+    async def acquire(self, url: str, session_key: Optional[Hashable] = None):
+        """
+        Wait until a request to url on the given session is allowed.
+
+        Args:
+            url (str): The url that will be requested, only its path is used.
+            session_key (Hashable): A key identifying the session making the request.
+        """
+        await self.acquire_shared(url)
+        await self.acquire_session(session_key)
+
+    async def acquire_shared(self, url: str):
+        """
+        Wait for the global and endpoint limits, the ones shared by every session.
+
+        Take these before leasing a session so a throttled request doesn't
+        hold a session other endpoints could use.
+
+        Args:
+            url (str): The url that will be requested, only its path is used.
+        """
+        endpoint_bucket = self.endpoint_buckets.get(urlparse(url).path)
+        if endpoint_bucket is not None:
+            await endpoint_bucket.acquire()
+
+        if self.global_bucket is not None:
+            await self.global_bucket.acquire()
+
+    async def acquire_session(self, session_key: Optional[Hashable]):
+        """
+        Wait for the limit of a single session.
+
+        Args:
+            session_key (Hashable): A key identifying the session making the request.
+        """
+        if self.session_rate is not None and session_key is not None:
+            session_bucket = self.session_buckets.get(session_key)
+            if session_bucket is None:
+                session_bucket = _bucket(self.session_rate)
+                self.session_buckets[session_key] = session_bucket
+            await session_bucket.acquire()
+
+    def forget(self, session_key: Hashable):
+        """Drop the bucket kept for a session that has been closed"""
+        self.session_buckets.pop(session_key, None)
@@ -0,0 +1,453 @@
+import asyncio
+import contextlib
+import dataclasses
+import time
+from typing import Any, Optional
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class FailedLease(Exception):
+    """
+    Raised inside SessionPool.acquire to count a request as failed while still returning its result.
+
+    The pool records the failure and re-raises this, so the caller can catch
+    it and use result.
+    """
+
+    def __init__(self, result: Any = None, quarantine: bool = False):
+        """
+        Args:
+            result (any): The result the caller should still use.
+            quarantine (bool): Whether the failure means the session itself is bad and counts towards opening its circuit.
+        """
+        self.result = result
+        self.quarantine = quarantine
+        super().__init__("The request failed on this session")
+
+
+@dataclasses.dataclass
+class SessionStats:
+    """Load and health statistics tracked for a single session"""
+
+    in_flight: int = 0
+    """The amount of requests currently running on the session."""
+    requests: int = 0
+    """The total amount of requests the session has finished."""
+    errors: int = 0
+    """The total amount of requests on the session that failed."""
+    consecutive_errors: int = 0
+    """The amount of requests that failed in a row because of the session, reset by a success."""
+    ewma_latency: Optional[float] = None
+    """Exponentially weighted moving average of request latency in seconds."""
+    error_rate: float = 0.0
+    """Exponentially weighted moving average of the failure rate (0 to 1)."""
+    last_used: float = dataclasses.field(default_factory=time.monotonic)
+    """The time.monotonic() timestamp the session was last handed out, or created."""
+    circuit: str = CIRCUIT_CLOSED
+    """The state of the session's circuit breaker, closed, open or half_open."""
+    circuit_opened_at: float = 0.0
+    """The time.monotonic() timestamp the circuit was last opened."""
+    quarantine_time: float = 0.0
+    """How long in seconds the circuit stays open before a probe request is let through."""
+    pinned: int = 0
+    """The amount of paginations currently pinned to the session."""
+
+    def record(
+        self, latency: float, success: bool, alpha: float, quarantine: bool = True
+    ):
+        """
+        Record the outcome of a finished request
+
+        Args:
+            latency (float): How long the request took in seconds.
+            success (bool): Whether the request succeeded.
+            alpha (float): The smoothing factor for the moving averages.
+            quarantine (bool): Whether a failure counts towards opening the session's circuit.
+        """
+        self.requests += 1
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = alpha * latency + (1 - alpha) * self.ewma_latency
+
+        self.error_rate = alpha * (0.0 if success else 1.0) + (1 - alpha) * self.error_rate
+        if success:
+            self.consecutive_errors = 0
+        else:
+            self.errors += 1
+            if quarantine:
+                self.consecutive_errors += 1
+
+
+class SessionPool:
+    """
+    Hands out the least loaded healthy session to each request.
+
+    Every session carries a :class:`SessionStats` that the pool updates as
+    requests are leased and returned. Sessions with an error rate above
+    max_error_rate are only used when no healthy session is free.
+
+    Each session also has a circuit breaker. After failure_threshold
+    failures in a row the circuit opens and the session is quarantined for
+    quarantine_time seconds. After that a single probe request is let
+    through (half open): if it succeeds the circuit closes, otherwise it
+    opens again for twice as long, up to max_quarantine_time.
+
+    Sessions marked as draining finish their running requests but aren't
+    handed out again.
+    """
+
+    def __init__(
+        self,
+        sessions: list,
+        max_concurrency_per_session: int = 4,
+        max_error_rate: float = 0.5,
+        ewma_alpha: float = 0.2,
+        failure_threshold: int = 3,
+        quarantine_time: float = 30.0,
+        max_quarantine_time: float = 600.0,
+    ):
+        """
+        Create a SessionPool.
+
+        Args:
+            sessions (list): The list of sessions to manage, this is shared with TikTokApi.sessions.
+            max_concurrency_per_session (int): The maximum amount of concurrent requests a single session will run.
+            max_error_rate (float): The error rate above which a session is treated as unhealthy.
+            ewma_alpha (float): The smoothing factor used for the latency and error rate averages.
+            failure_threshold (int): The amount of failures in a row that quarantines a session.
+            quarantine_time (float): How long in seconds a session is first quarantined for.
+            max_quarantine_time (float): The longest a session is quarantined for after repeated failed probes.
+        """
+        self.sessions = sessions
+        self.max_concurrency_per_session = max_concurrency_per_session
+        self.max_error_rate = max_error_rate
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = failure_threshold
+        self.quarantine_time = quarantine_time
+        self.max_quarantine_time = max_quarantine_time
+        self._condition = None
+        self._waiting_since = []
+        self.on_release = None
+        """Called with each session after a request on it finishes."""
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        # Created lazily so the pool can be built outside of a running event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def is_healthy(self, session) -> bool:
+        """Whether a session's recent error rate is acceptable"""
+        return session.stats.error_rate <= self.max_error_rate
+
+    def is_quarantined(self, session, now: Optional[float] = None) -> bool:
+        """Whether a session's circuit is open and its quarantine hasn't expired yet"""
+        stats = session.stats
+        if stats.circuit != CIRCUIT_OPEN:
+            return False
+        now = time.monotonic() if now is None else now
+        return now - stats.circuit_opened_at < stats.quarantine_time
+
+    def _is_available(self, session, now: float, weight: int = 1) -> bool:
+        if getattr(session, "draining", False):
+            return False
+        if self.is_quarantined(session, now):
+            return False
+        if session.stats.circuit != CIRCUIT_CLOSED:
+            # Only a single probe request is allowed through a half open circuit
+            return session.stats.in_flight == 0
+        return session.stats.in_flight + weight <= self.max_concurrency_per_session
+
+    def _next_quarantine_expiry(self, now: float) -> Optional[float]:
+        """Seconds until the next quarantined session can be probed, None if none are quarantined"""
+        remaining = [
+            s.stats.circuit_opened_at + s.stats.quarantine_time - now
+            for s in self.sessions
+            if self.is_quarantined(s, now)
+        ]
+        return max(0.0, min(remaining)) if len(remaining) > 0 else None
+
+    def _record(self, session, latency: float, success: bool, quarantine: bool):
+        """Record a finished request and move the session's circuit breaker"""
+        stats = session.stats
+        stats.record(latency, success, self.ewma_alpha, quarantine=quarantine)
+        if success:
+            stats.circuit = CIRCUIT_CLOSED
+            stats.quarantine_time = 0.0
+        elif quarantine and (
+            stats.circuit == CIRCUIT_HALF_OPEN
+            or stats.consecutive_errors >= self.failure_threshold
+        ):
+            if stats.circuit == CIRCUIT_HALF_OPEN:
+                stats.quarantine_time = min(
+                    stats.quarantine_time * 2, self.max_quarantine_time
+                )
+            else:
+                stats.quarantine_time = self.quarantine_time
+            stats.circuit = CIRCUIT_OPEN
+            stats.circuit_opened_at = time.monotonic()
+
+    def _can_prefer(self, session, now: float, exclude: Optional[list]) -> bool:
+        return (
+            any(s is session for s in self.sessions)
+            and not getattr(session, "draining", False)
+            and not self.is_quarantined(session, now)
+            and not any(session is e for e in exclude or [])
+        )
+
+    def _load_key(self, session):
+        stats = session.stats
+        latency = stats.ewma_latency if stats.ewma_latency is not None else 0.0
+        return (
+            getattr(session, "draining", False),
+            self.is_quarantined(session),
+            not self.is_healthy(session),
+            stats.in_flight,
+            stats.pinned,
+            stats.error_rate,
+            latency,
+            stats.last_used,
+        )
+
+    def pick(
+        self,
+        session_index: Optional[int] = None,
+        available_only: bool = False,
+        exclude: Optional[list] = None,
+        prefer: Any = None,
+        weight: int = 1,
+    ):
+        """
+        Pick the least loaded healthy session without leasing it.
+
+        Args:
+            session_index (int): The index of the session you want to use, if not provided the least loaded session will be used.
+            available_only (bool): Only consider sessions that are below their concurrency cap and not quarantined.
+            exclude (list): Sessions to avoid, they're only picked if no other session exists.
+            prefer (TikTokPlaywrightSession): A session to stick to while it's in the pool, not draining, not quarantined and not excluded.
+            weight (int): The amount of requests the lease runs at once, a session is only available if it has room for all of them.
+
+        Returns:
+            int: The index of the session, or None if available_only is set and every session is busy.
+            TikTokPlaywrightSession: The session, or None.
+        """
+        if len(self.sessions) == 0:
+            raise Exception("No sessions created, please create sessions first")
+
+        if session_index is not None:
+            session = self.sessions[session_index]
+            if available_only and (
+                session.stats.in_flight + weight > self.max_concurrency_per_session
+            ):
+                return None, None
+            return session_index, session
+
+        now = time.monotonic()
+        candidates = list(enumerate(self.sessions))
+        if prefer is not None and self._can_prefer(prefer, now, exclude):
+            candidates = [(i, s) for i, s in candidates if s is prefer]
+        elif exclude:
+            others = [(i, s) for i, s in candidates if not any(s is e for e in exclude)]
+            if len(others) > 0:
+                candidates = others
+        if available_only:
+            candidates = [
+                (i, s) for i, s in candidates if self._is_available(s, now, weight)
+            ]
+            if len(candidates) == 0:
+                return None, None
+
+        return min(candidates, key=lambda c: self._load_key(c[1]))
+
+    @contextlib.asynccontextmanager
+    async def acquire(
+        self,
+        session_index: Optional[int] = None,
+        exclude: Optional[list] = None,
+        affinity: Optional["SessionAffinity"] = None,
+        weight: int = 1,
+    ):
+        """
+        Lease a session for the duration of a request.
+
+        Waits until a session is below its concurrency cap and not
+        quarantined, records the request's latency when the block exits and
+        counts it as an error if the block raised. Raise FailedLease to count
+        the request as failed while still returning a result.
+
+        Args:
+            session_index (int): The index of the session you want to use, if not provided the least loaded session will be used.
+            exclude (list): Sessions to avoid, eg. ones a request already failed on.
+            affinity (SessionAffinity): Stick to the affinity's session while it's usable, waiting for it if it's busy. The session that's leased becomes the affinity's session.
+            weight (int): The amount of requests run at once under the lease, eg. a batch, each counts towards the session's concurrency cap.
+
+        Yields:
+            tuple[int, TikTokPlaywrightSession]: The index of the session and the session.
+        """
+        weight = max(1, min(weight, self.max_concurrency_per_session))
+        async with self.condition:
+            waiting_since = time.monotonic()
+            self._waiting_since.append(waiting_since)
+            try:
+                while True:
+                    i, session = self.pick(
+                        session_index,
+                        available_only=True,
+                        exclude=exclude,
+                        prefer=affinity.session if affinity is not None else None,
+                        weight=weight,
+                    )
+                    if session is not None:
+                        break
+                    # Quarantines expire without anyone notifying, so don't wait past the next one
+                    timeout = self._next_quarantine_expiry(time.monotonic())
+                    try:
+                        await asyncio.wait_for(self.condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                self._waiting_since.remove(waiting_since)
+            if session.stats.circuit == CIRCUIT_OPEN and not self.is_quarantined(session):
+                session.stats.circuit = CIRCUIT_HALF_OPEN
+            session.stats.in_flight += weight
+            session.stats.last_used = time.monotonic()
+            if affinity is not None:
+                affinity.pin(session)
+
+        start = time.monotonic()
+        success = False
+        quarantine = True
+        try:
+            yield i, session
+            success = True
+        except FailedLease as e:
+            quarantine = e.quarantine
+            raise
+        except asyncio.CancelledError:
+            # Cancelled by the caller, eg. a deadline passing or a hedge losing,
+            # so the request has no outcome to hold against the session
+            success = None
+            raise
+        finally:
+            session.stats.in_flight -= weight
+            if success is not None:
+                self._record(session, time.monotonic() - start, success, quarantine)
+            if self.on_release is not None:
+                self.on_release(session)
+            async with self.condition:
+                self.condition.notify_all()
+
+    @property
+    def waiting(self) -> int:
+        """The amount of requests waiting for a free session"""
+        return len(self._waiting_since)
+
+    def longest_wait(self) -> float:
+        """How long in seconds the longest waiting request has been waiting, 0 if none are"""
+        if len(self._waiting_since) == 0:
+            return 0.0
+        return time.monotonic() - min(self._waiting_since)
+
+    def idle_sessions(self, idle_for: float) -> list:
+        """
+        Get the sessions that have no requests running and haven't been used for a while.
+
+        Args:
+            idle_for (float): The amount of seconds since a session was last used for it to count as idle.
+
+        Returns:
+            list[TikTokPlaywrightSession]: The idle sessions, least recently used first.
+        """
+        now = time.monotonic()
+        idle = [
+            session
+            for session in self.sessions
+            if session.stats.in_flight == 0
+            and not getattr(session, "draining", False)
+            and now - session.stats.last_used >= idle_for
+        ]
+        return sorted(idle, key=lambda session: session.stats.last_used)
+
+    def scale_decision(
+        self,
+        min_sessions: int,
+        max_sessions: int,
+        scale_up_wait: float,
+        idle_timeout: float,
+    ) -> int:
+        """
+        Decide whether the pool should grow or shrink.
+
+        Args:
+            min_sessions (int): The smallest the pool may be.
+            max_sessions (int): The largest the pool may be.
+            scale_up_wait (float): Grow when a request has waited this many seconds for a free session.
+            idle_timeout (float): Shrink when a session has been idle for this many seconds.
+
+        Returns:
+            int: 1 to add a session, -1 to close an idle session, 0 to do nothing.
+        """
+        size = len(self.sessions)
+        if size < min_sessions:
+            return 1
+        if size < max_sessions and self.waiting > 0:
+            if self.longest_wait() >= scale_up_wait:
+                return 1
+        elif size > min_sessions and self.waiting == 0:
+            if len(self.idle_sessions(idle_timeout)) > 0:
+                return -1
+        return 0
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """
+        Get the current statistics of every session in the pool.
+
+        Returns:
+            list[dict]: One dictionary of SessionStats fields per session, in session index order.
+        """
+        return [dataclasses.asdict(session.stats) for session in self.sessions]
+
+
+class SessionAffinity:
+    """
+    Keeps the requests of one pagination on the same session.
+
+    The first request pins the session it's leased, later requests wait for
+    that session instead of spreading over the pool, so cursors and device
+    fingerprints don't get mixed. If the session fails, is quarantined or is
+    drained, the next request moves the pin to another session. Call release
+    once the pagination is finished.
+
+    Example Usage:
+        .. code-block:: python
+
+            affinity = SessionAffinity()
+            try:
+                first_page = await api.make_request(url, params=params, affinity=affinity)
+                second_page = await api.make_request(url, params=next_params, affinity=affinity)
+            finally:
+                affinity.release()
+    """
+
+    def __init__(self):
+        self.session = None
+        """The pinned session, None until the first request."""
+
+    def pin(self, session):
+        """Pin a session, moving the pin off the previous one"""
+        if session is self.session:
+            return
+        self.release()
+        self.session = session
+        session.stats.pinned += 1
+
+    def release(self):
+        """Unpin the session"""
+        if self.session is not None:
+            self.session.stats.pinned -= 1
+            self.session = None
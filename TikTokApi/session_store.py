@@ -0,0 +1,76 @@
+import json
+import os
+import time
+from typing import Optional
+
+
+class SessionStore:
+    """
+    Saves sessions to a directory so a restarted process can warm start them.
+
+    Each session is stored as a json file holding the Playwright storage state
+    (cookies and local storage), the msToken, the fingerprint params and the
+    captured request headers, along with the time the session was created.
+
+    Example Usage:
+        .. code-block:: python
+
+            await api.create_sessions(num_sessions=5, state_dir=".tiktok_sessions")
+    """
+
+    def __init__(self, path: str, max_age: Optional[float] = 6 * 60 * 60):
+        """
+        Create a SessionStore.
+
+        Args:
+            path (str): The directory the sessions are saved in, it's created if it doesn't exist.
+            max_age (float): The age in seconds since a session was created after which it's stale and gets refreshed, None to never expire.
+        """
+        self.path = path
+        self.max_age = max_age
+
+    def is_fresh(self, state: dict) -> bool:
+        """Whether a saved session is young enough to be used"""
+        if self.max_age is None:
+            return True
+        return time.time() - state.get("created_at", 0) < self.max_age
+
+    def load(self) -> list[dict]:
+        """
+        Load every saved session.
+
+        Returns:
+            list[dict]: The saved sessions, newest first. Files that can't be read are skipped.
+        """
+        if not os.path.isdir(self.path):
+            return []
+
+        states = []
+        for filename in sorted(os.listdir(self.path)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.path, filename), "r", encoding="utf-8") as f:
+                    states.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return sorted(states, key=lambda s: s.get("created_at", 0), reverse=True)
+
+    def save_all(self, states: list[dict]):
+        """
+        Replace the saved sessions with states.
+
+        Args:
+            states (list[dict]): The sessions to save.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        for filename in os.listdir(self.path):
+            if filename.startswith("session-") and filename.endswith(".json"):
+                os.remove(os.path.join(self.path, filename))
+
+        for i, state in enumerate(states):
+            filename = os.path.join(self.path, f"session-{i}.json")
+            # Write then rename so a crash never leaves a half written session behind
+            with open(filename + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(filename + ".tmp", filename)
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Call:
+    """A request in flight and the amount of callers waiting on it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces identical requests that are in flight at the same time.
+
+    The first caller for a key starts the request, callers that arrive while
+    it's running wait for the same result instead of starting their own. The
+    result object is shared between every caller. The request is only
+    cancelled once every caller waiting on it has been cancelled.
+    """
+
+    def __init__(self):
+        self.calls: dict[Hashable, _Call] = {}
+        self.started = 0
+        """The amount of requests that were actually made."""
+        self.coalesced = 0
+        """The amount of callers that shared a request already in flight."""
+
+    def _forget(self, key: Hashable, call: _Call, task: asyncio.Task):
+        if self.calls.get(key) is call:
+            del self.calls[key]
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn, or wait for the run already in flight for key.
+
+        Args:
+            key (Hashable): Identifies the request, callers with equal keys share a result.
+            fn (Callable[[], Awaitable]): Starts the request.
+
+        Returns:
+            any: The result of fn.
+        """
+        call = self.calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self.calls[key] = call
+            call.task.add_done_callback(lambda task: self._forget(key, call, task))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # Nobody else is waiting for it anymore
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
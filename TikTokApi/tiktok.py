@@ -1,4 +1,5 @@
 import asyncio
+import contextlib
 import logging
 import dataclasses
 from typing import Any
@@ -7,9 +8,20 @@ import time
 import json
 
 from playwright.async_api import async_playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from urllib.parse import urlencode, quote, urlparse
 from .stealth import stealth_async
-from .helpers import random_choice
+from .js.request_executor import request_executor
+from .helpers import random_choice, request_key
+from .session_pool import FailedLease, SessionAffinity, SessionPool, SessionStats
+from .rate_limit import RateLimiter
+from .transport import HTTPTransport, Transport, TRANSPORTS
+from .session_store import SessionStore
+from .hedging import HedgePolicy
+from .concurrency import AdaptiveConcurrencyLimiter
+from .proxy_pool import ProxyPool
+from .singleflight import SingleFlight
+from .cache import ResponseCache
 
 from .api.user import User
 from .api.video import Video
@@ -20,10 +32,24 @@ from .api.trending import Trending
 from .api.search import Search
 
 from .exceptions import (
+    CaptchaException,
     InvalidJSONException,
     EmptyResponseException,
+    TimeoutException,
 )
 
+# Failures that mean the session itself is in a bad state, these are retried on another session
+SESSION_FAILURES = (
+    CaptchaException,
+    EmptyResponseException,
+    InvalidJSONException,
+    TimeoutException,
+)
+
+# Markers of TikTok's captcha / verification pages and responses
+CAPTCHA_MARKERS = ("captcha", "verify-bar", "secsdk-captcha")
+CAPTCHA_KEYS = ("verifyConfig", "captcha")
+
 
 @dataclasses.dataclass
 class TikTokPlaywrightSession:
@@ -36,6 +62,11 @@ class TikTokPlaywrightSession:
     headers: dict = None
     ms_token: str = None
     base_url: str = "https://www.tiktok.com"
+    browser: Any = None
+    signer_ready: bool = False
+    draining: bool = False
+    created_at: float = dataclasses.field(default_factory=time.time)
+    stats: SessionStats = dataclasses.field(default_factory=SessionStats)
 
 
 class TikTokApi:
@@ -56,15 +87,52 @@ class TikTokApi:
     trending = Trending
     search = Search
 
-    def __init__(self, logging_level: int = logging.WARN, logger_name: str = None):
+    def __init__(
+        self,
+        logging_level: int = logging.WARN,
+        logger_name: str = None,
+        rate_limiter: RateLimiter = None,
+        transport: str = "playwright",
+        hedge_policy: HedgePolicy = None,
+        concurrency_limiter: AdaptiveConcurrencyLimiter = None,
+        cache: ResponseCache = None,
+    ):
         """
         Create a TikTokApi object.
 
         Args:
             logging_level (int): The logging level you want to use.
             logger_name (str): The name of the logger you want to use.
+            rate_limiter (RateLimiter): Limits how fast requests are sent to TikTok, requests over the limit wait their turn.
+            transport (str): How requests are sent, either "playwright" to fetch inside the browser page or "http" to only sign urls in the browser and fetch them with a pooled HTTP client (requires httpx).
+            hedge_policy (HedgePolicy): Sends a duplicate of slow requests to another session, keeping whichever answers first.
+            concurrency_limiter (AdaptiveConcurrencyLimiter): Adapts how many requests run at once per endpoint and per proxy to TikTok's error and captcha rates.
+            cache (ResponseCache): Caches responses of slowly changing endpoints, such as user details, for make_request.
         """
         self.sessions = []
+        self.session_pool = SessionPool(self.sessions)
+        self.rate_limiter = rate_limiter
+        self.hedge_policy = hedge_policy
+        self.concurrency_limiter = concurrency_limiter
+        self.proxy_pool = None
+        self.singleflight = SingleFlight()
+        self.cache = cache
+        self.session_store = None
+        self.browsers = []
+        # Browsers picked for sessions that are still starting, counted towards their load
+        self._starting_browsers = []
+        self.recycle_after_requests = None
+        self.recycle_after = None
+        self.recycle_after_failures = None
+        self.session_pool.on_release = self.__check_recycle
+        self._background_tasks = set()
+
+        if isinstance(transport, Transport):
+            self.transport = transport
+        elif transport in TRANSPORTS:
+            self.transport = TRANSPORTS[transport](self)
+        else:
+            raise ValueError(f"Invalid transport argument passed: {transport}")
 
         if logger_name is None:
             logger_name = __name__
@@ -91,18 +159,22 @@ class TikTokApi:
 
     async def __set_session_params(self, session: TikTokPlaywrightSession):
         """Set the session params for a TikTokPlaywrightSession"""
-        user_agent = await session.page.evaluate("() => navigator.userAgent")
-        language = await session.page.evaluate(
-            "() => navigator.language || navigator.userLanguage"
+        fingerprint = await session.page.evaluate(
+            """() => ({
+                userAgent: navigator.userAgent,
+                language: navigator.language || navigator.userLanguage,
+                platform: navigator.platform,
+                timezone: Intl.DateTimeFormat().resolvedOptions().timeZone,
+            })"""
         )
-        platform = await session.page.evaluate("() => navigator.platform")
+        user_agent = fingerprint["userAgent"]
+        language = fingerprint["language"]
+        platform = fingerprint["platform"]
+        timezone = fingerprint["timezone"]
         device_id = str(random.randint(10**18, 10**19 - 1))  # Random device id
         history_len = str(random.randint(1, 10))  # Random history length
         screen_height = str(random.randint(600, 1080))  # Random screen height
         screen_width = str(random.randint(800, 1920))  # Random screen width
-        timezone = await session.page.evaluate(
-            "() => Intl.DateTimeFormat().resolvedOptions().timeZone"
-        )
 
         session_params = {
             "aid": "1988",
@@ -134,23 +206,61 @@ class TikTokApi:
         }
         session.params = session_params
 
+    async def __wait_for_ms_token(
+        self, session: TikTokPlaywrightSession, timeout: float
+    ) -> str:
+        """Wait for TikTok to set the msToken cookie on a session, returns None on timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            cookies = await self.get_session_cookies(session)
+            if cookies.get("msToken") is not None or time.monotonic() >= deadline:
+                return cookies.get("msToken")
+            await asyncio.sleep(0.1)
+
+    async def __accept_cookies(self, page, timeout: float):
+        """Click the cookie consent button if it shows up within timeout seconds"""
+        # click where 'Accept All' appears inside a Button tag
+        button = page.locator("button:text('Accept All')")
+        deadline = time.monotonic() + timeout
+        try:
+            while await button.count() == 0:
+                if time.monotonic() >= deadline:
+                    self.logger.debug("No cookie consent button found, skipping it")
+                    return
+                await asyncio.sleep(0.1)
+            await button.first.click(timeout=timeout * 1000)
+        except Exception:
+            self.logger.debug("Failed to click the cookie consent button, skipping it")
+
     async def __create_session(
         self,
         url: str = "https://www.tiktok.com",
         ms_token: str = None,
         proxy: str = None,
         context_options: dict = {},
-        sleep_after: int = 1,
         cookies: dict = None,
         suppress_resource_load_types: list[str] = None,
-    ):
-        """Create a TikTokPlaywrightSession"""
-        if ms_token is not None:
+        startup_timeout: float = 10,
+        saved_state: dict = None,
+        browser=None,
+    ) -> TikTokPlaywrightSession:
+        """Create a TikTokPlaywrightSession, warm starting it from saved_state if given"""
+        if saved_state is not None:
+            ms_token = saved_state.get("ms_token")
+            proxy = saved_state.get("proxy")
+            url = saved_state.get("base_url", url)
+            context_options = {
+                **context_options,
+                "storage_state": saved_state["storage_state"],
+            }
+        elif ms_token is not None:
             if cookies is None:
                 cookies = {}
             cookies["msToken"] = ms_token
 
-        context = await self.browser.new_context(proxy=proxy, **context_options)
+        if browser is None:
+            browser = self.__least_loaded_browser()
+        context = await browser.new_context(proxy=proxy, **context_options)
         if cookies is not None:
             formatted_cookies = [
                 {"name": k, "value": v, "domain": urlparse(url).netloc, "path": "/"}
@@ -160,6 +270,7 @@ class TikTokApi:
             await context.add_cookies(formatted_cookies)
         page = await context.new_page()
         await stealth_async(page)
+        await page.add_init_script(request_executor)
 
         # Get the request headers to the url
         request_headers = None
@@ -178,32 +289,60 @@ class TikTokApi:
                 else route.continue_(),
             )
 
-        await page.goto(url)
-        await page.wait_for_timeout(3000)
-        # accept cookies, click where 'Accept All' appears inside a Button tag
-        await page.click("button:text('Accept All')")
-        await page.wait_for_timeout(3000)
+        await page.goto(url, wait_until="domcontentloaded")
 
         session = TikTokPlaywrightSession(
             context,
             page,
             ms_token=ms_token,
             proxy=proxy,
+            browser=browser,
             headers=request_headers,
             base_url=url,
         )
+
+        if saved_state is not None:
+            # The msToken and fingerprint are already known, the signer is awaited on first use
+            session.params = saved_state.get("params")
+            session.headers = saved_state.get("headers") or request_headers
+            session.created_at = saved_state.get("created_at", session.created_at)
+            self.sessions.append(session)
+            return session
+
+        # Wait for the page to be usable instead of sleeping a fixed amount
+        async def wait_for_signer():
+            try:
+                await page.wait_for_function(
+                    "window.byted_acrawler !== undefined",
+                    timeout=startup_timeout * 1000,
+                )
+                session.signer_ready = True
+            except Exception:
+                self.logger.info(
+                    "Signer didn't load during session startup, requests will wait for it"
+                )
+
+        consent = asyncio.ensure_future(
+            self.__accept_cookies(page, min(startup_timeout, 3))
+        )
+        startup = [wait_for_signer(), self.__set_session_params(session)]
         if ms_token is None:
-            time.sleep(sleep_after)  # TODO: Find a better way to wait for msToken
-            cookies = await self.get_session_cookies(session)
-            ms_token = cookies.get("msToken")
-            session.ms_token = ms_token
-            if ms_token is None:
+            startup.append(self.__wait_for_ms_token(session, startup_timeout))
+        try:
+            results = await asyncio.gather(*startup)
+        finally:
+            # Once the session is usable a missing banner isn't worth waiting for
+            consent.cancel()
+            await asyncio.gather(consent, return_exceptions=True)
+
+        if ms_token is None:
+            session.ms_token = results[-1]
+            if session.ms_token is None:
                 self.logger.info(
-                    f"Failed to get msToken on session index {
-                        len(self.sessions)}, you should consider specifying ms_tokens"
+                    f"Failed to get msToken on session index {len(self.sessions)}, you should consider specifying ms_tokens"
                 )
         self.sessions.append(session)
-        await self.__set_session_params(session)
+        return session
 
     async def create_sessions(
         self,
@@ -218,7 +357,21 @@ class TikTokApi:
         cookies: list[dict] = None,
         suppress_resource_load_types: list[str] = None,
         browser: str = "chromium",
-        executable_path: str = None
+        executable_path: str = None,
+        max_concurrency_per_session: int = 4,
+        startup_concurrency: int = 5,
+        startup_timeout: float = 10,
+        state_dir: str = None,
+        state_max_age: float = 6 * 60 * 60,
+        min_sessions: int = None,
+        max_sessions: int = None,
+        scale_up_wait: float = 0.5,
+        idle_timeout: float = 60,
+        autoscale_interval: float = 1,
+        num_browsers: int = 1,
+        recycle_after_requests: int = None,
+        recycle_after: float = None,
+        recycle_after_failures: int = None,
     ):
         """
         Create sessions for use within the TikTokApi class.
@@ -230,8 +383,8 @@ class TikTokApi:
             headless (bool): Whether or not you want the browser to be headless.
             ms_tokens (list[str]): A list of msTokens to use for the sessions, you can get these from your cookies after visiting TikTok.
                                    If you don't provide any, the sessions will try to get them themselves, but this is not guaranteed to work.
-            proxies (list): A list of proxies to use for the sessions
-            sleep_after (int): The amount of time to sleep after creating a session, this is to allow the msToken to be generated.
+            proxies (list | ProxyPool): The proxies to use for the sessions, sessions are assigned to the healthiest and fastest ones and moved off proxies that go bad. Pass a ProxyPool to configure how proxies are judged.
+            sleep_after (int): Deprecated, sessions now wait for the msToken cookie to be set (up to startup_timeout) instead of sleeping.
             starting_url (str): The url to start the sessions on, this is usually https://www.tiktok.com.
             context_options (dict): Options to pass to the playwright context.
             override_browser_args (list[dict]): A list of dictionaries containing arguments to pass to the browser.
@@ -239,6 +392,20 @@ class TikTokApi:
             suppress_resource_load_types (list[str]): Types of resources to suppress playwright from loading, excluding more types will make playwright faster.. Types: document, stylesheet, image, media, font, script, textrack, xhr, fetch, eventsource, websocket, manifest, other.
             browser (str): specify either firefox or chromium, default is chromium
             executable_path (str): Path to the browser executable
+            max_concurrency_per_session (int): The maximum amount of requests that will run on a single session at once, extra requests wait for a free session.
+            startup_concurrency (int): The maximum amount of sessions started at the same time, the rest start as earlier ones finish.
+            startup_timeout (float): The maximum time in seconds to wait for a new session's msToken and signer to be ready.
+            state_dir (str): A directory to save sessions in and warm start them from on the next run, skipping msToken acquisition.
+            state_max_age (float): The age in seconds after which a saved session is stale, stale sessions are replaced by new ones in the background.
+            min_sessions (int): The smallest the session pool may shrink to, defaults to num_sessions.
+            max_sessions (int): The largest the session pool may grow to, defaults to num_sessions. Setting it above min_sessions enables autoscaling.
+            scale_up_wait (float): When autoscaling, a session is added once a request has waited this many seconds for a free session.
+            idle_timeout (float): When autoscaling, a session is closed once it has been idle for this many seconds.
+            autoscale_interval (float): How often in seconds the autoscaler checks the pool.
+            num_browsers (int): The amount of browser processes to spread sessions over, more browsers let signing and fetching use more CPU cores and limit a browser crash to its share of the sessions.
+            recycle_after_requests (int): Replace a session after it has made this many requests.
+            recycle_after (float): Replace a session once it's this many seconds old.
+            recycle_after_failures (int): Replace a session after this many requests in a row failed on it.
 
         Example Usage:
             .. code-block:: python
@@ -247,36 +414,257 @@ class TikTokApi:
                 with TikTokApi() as api:
                     await api.create_sessions(num_sessions=5, ms_tokens=['msToken1', 'msToken2'])
         """
+        self.session_pool.max_concurrency_per_session = max_concurrency_per_session
+        self.recycle_after_requests = recycle_after_requests
+        self.recycle_after = recycle_after
+        self.recycle_after_failures = recycle_after_failures
+        if isinstance(proxies, ProxyPool):
+            self.proxy_pool = proxies
+        elif proxies:
+            self.proxy_pool = ProxyPool(proxies)
+
         self.playwright = await async_playwright().start()
         if browser == "chromium":
             if headless and override_browser_args is None:
                 override_browser_args = ["--headless=new"]
                 headless = False  # managed by the arg
-            self.browser = await self.playwright.chromium.launch(
-                headless=headless, args=override_browser_args, proxy=random_choice(proxies), executable_path=executable_path
-            )
+            browser_type = self.playwright.chromium
         elif browser == "firefox":
-            self.browser = await self.playwright.firefox.launch(
-                headless=headless, args=override_browser_args, proxy=random_choice(proxies), executable_path=executable_path
-            )
+            browser_type = self.playwright.firefox
         else:
             raise ValueError("Invalid browser argument passed")
 
-        await asyncio.gather(
+        self.browsers = await asyncio.gather(
             *(
-                self.__create_session(
-                    proxy=random_choice(proxies),
-                    ms_token=random_choice(ms_tokens),
-                    url=starting_url,
-                    context_options=context_options,
-                    sleep_after=sleep_after,
-                    cookies=random_choice(cookies),
-                    suppress_resource_load_types=suppress_resource_load_types,
+                browser_type.launch(
+                    headless=headless,
+                    args=override_browser_args,
+                    proxy=self.proxy_pool.best() if self.proxy_pool is not None else None,
+                    executable_path=executable_path,
+                )
+                for _ in range(num_browsers)
+            )
+        )
+        self.browser = self.browsers[0]
+        for launched_browser in self.browsers:
+            launched_browser.on("disconnected", self.__handle_browser_disconnected)
+
+        # Ramp up in waves so a large pool doesn't start every context at once
+        startup_semaphore = asyncio.Semaphore(startup_concurrency)
+
+        async def create_session(saved_state=None, exclude_proxies=None):
+            async with startup_semaphore:
+                proxy = None
+                if self.proxy_pool is not None:
+                    if saved_state is not None:
+                        proxy = saved_state.get("proxy")
+                        self.proxy_pool.add_session(proxy)
+                    else:
+                        proxy = self.proxy_pool.assign(exclude=exclude_proxies)
+                # Picked before the first await and counted while starting, so a
+                # wave of sessions spreads over the browsers
+                session_browser = self.__least_loaded_browser()
+                self._starting_browsers.append(session_browser)
+                try:
+                    await self.__create_session(
+                        proxy=proxy,
+                        ms_token=random_choice(ms_tokens),
+                        url=starting_url,
+                        context_options=context_options,
+                        cookies=random_choice(cookies),
+                        suppress_resource_load_types=suppress_resource_load_types,
+                        startup_timeout=startup_timeout,
+                        saved_state=saved_state,
+                        browser=session_browser,
+                    )
+                except Exception:
+                    if self.proxy_pool is not None:
+                        self.proxy_pool.remove_session(proxy)
+                    raise
+                finally:
+                    self._starting_browsers.remove(session_browser)
+
+        self._create_pool_session = create_session
+
+        saved_states = []
+        stale_count = 0
+        if state_dir is not None:
+            self.session_store = SessionStore(state_dir, max_age=state_max_age)
+            for state in self.session_store.load()[:num_sessions]:
+                if self.session_store.is_fresh(state):
+                    saved_states.append(state)
+                else:
+                    stale_count += 1
+
+        await asyncio.gather(
+            *(create_session(state) for state in saved_states),
+            *(create_session() for _ in range(num_sessions - len(saved_states) - stale_count)),
+        )
+
+        if stale_count > 0 and len(self.sessions) > 0:
+            # Replace stale saved sessions in the background, the warm ones can serve requests meanwhile
+            async def refresh_stale():
+                await asyncio.gather(*(create_session() for _ in range(stale_count)))
+                self.num_sessions = len(self.sessions)
+                await self.save_sessions()
+
+            self._start_background_task(refresh_stale())
+        elif stale_count > 0:
+            await asyncio.gather(*(create_session() for _ in range(stale_count)))
+        self.num_sessions = len(self.sessions)
+        if self.session_store is not None:
+            await self.save_sessions()
+
+        min_sessions = num_sessions if min_sessions is None else min_sessions
+        max_sessions = max(num_sessions, min_sessions) if max_sessions is None else max_sessions
+        if max_sessions > min_sessions:
+            self._start_background_task(
+                self.__autoscale(
+                    min_sessions,
+                    max_sessions,
+                    scale_up_wait,
+                    idle_timeout,
+                    autoscale_interval,
                 )
-                for _ in range(num_sessions)
             )
+
+    def __recycle_reason(self, session: TikTokPlaywrightSession) -> str:
+        """Get why a session should be recycled, or None if it shouldn't be"""
+        stats = session.stats
+        if (
+            self.recycle_after_requests is not None
+            and stats.requests >= self.recycle_after_requests
+        ):
+            return f"it made {stats.requests} requests"
+        if (
+            self.recycle_after is not None
+            and time.time() - session.created_at >= self.recycle_after
+        ):
+            return f"it is older than {self.recycle_after} seconds"
+        if (
+            self.recycle_after_failures is not None
+            and stats.consecutive_errors >= self.recycle_after_failures
+        ):
+            return f"its last {stats.consecutive_errors} requests failed"
+        if self.proxy_pool is not None and self.proxy_pool.has_better(session.proxy):
+            return "its proxy is performing badly"
+        return None
+
+    def __check_recycle(self, session: TikTokPlaywrightSession):
+        """Start replacing a session in the background if it's due to be recycled"""
+        if session.draining or getattr(self, "_create_pool_session", None) is None:
+            return
+        reason = self.__recycle_reason(session)
+        if reason is not None:
+            session.draining = True
+            self._start_background_task(self.__recycle_session(session, reason))
+
+    async def __recycle_session(self, session: TikTokPlaywrightSession, reason: str):
+        """Create a replacement for a session, then close it once its requests finish"""
+        self.logger.info(f"Recycling a session because {reason}")
+        try:
+            # Rebuilding the context is what moves a session off a bad proxy
+            await self._create_pool_session(exclude_proxies=[session.proxy])
+        except Exception as e:
+            self.logger.error(f"Failed to create a replacement session, keeping the old one: {e}")
+            session.draining = False
+            return
+
+        while session.stats.in_flight > 0:
+            await asyncio.sleep(0.1)
+        await self._close_session(session)
+        self.num_sessions = len(self.sessions)
+
+    def __least_loaded_browser(self):
+        """Get the browser that has the fewest sessions"""
+        connected = [b for b in self.browsers if b.is_connected()]
+        if len(connected) == 0:
+            raise Exception("No browsers are running, please create sessions first")
+        return min(
+            connected,
+            key=lambda b: sum(1 for session in self.sessions if session.browser is b)
+            + sum(1 for starting in self._starting_browsers if starting is b),
         )
+
+    def __handle_browser_disconnected(self, browser):
+        """Drop the sessions of a browser that crashed or was closed"""
+        lost = [session for session in self.sessions if session.browser is browser]
+        for session in lost:
+            self.sessions.remove(session)
+            if self.rate_limiter is not None:
+                self.rate_limiter.forget(id(session))
+            if self.proxy_pool is not None:
+                self.proxy_pool.remove_session(session.proxy)
         self.num_sessions = len(self.sessions)
+        if len(lost) > 0:
+            self.logger.error(
+                f"A browser disconnected, removed its {len(lost)} sessions from the pool"
+            )
+
+    async def __autoscale(
+        self,
+        min_sessions: int,
+        max_sessions: int,
+        scale_up_wait: float,
+        idle_timeout: float,
+        interval: float,
+    ):
+        """Grow the session pool while requests queue up and shrink it when sessions sit idle"""
+        while True:
+            await asyncio.sleep(interval)
+            decision = self.session_pool.scale_decision(
+                min_sessions, max_sessions, scale_up_wait, idle_timeout
+            )
+            if decision > 0:
+                self.logger.info(
+                    f"Scaling up to {len(self.sessions) + 1} sessions, {self.session_pool.waiting} requests waiting"
+                )
+                try:
+                    await self._create_pool_session()
+                except Exception as e:
+                    self.logger.error(f"Failed to create a session while scaling up: {e}")
+            elif decision < 0:
+                session = self.session_pool.idle_sessions(idle_timeout)[0]
+                self.logger.info(f"Scaling down to {len(self.sessions) - 1} sessions")
+                await self._close_session(session)
+            self.num_sessions = len(self.sessions)
+
+    def _start_background_task(self, coro) -> asyncio.Task:
+        """Run a coroutine in the background, keeping a reference so it isn't garbage collected"""
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+
+        def done(task):
+            self._background_tasks.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                self.logger.error(f"Background task failed: {task.exception()}")
+
+        task.add_done_callback(done)
+        return task
+
+    async def save_sessions(self):
+        """
+        Save every session to the state_dir passed to create_sessions.
+
+        This is called automatically after creating and before closing sessions.
+        """
+        if self.session_store is None:
+            raise Exception("No state_dir was given to create_sessions")
+
+        states = []
+        for session in self.sessions:
+            states.append(
+                {
+                    "storage_state": await session.context.storage_state(),
+                    "ms_token": session.ms_token,
+                    "params": session.params,
+                    "headers": session.headers,
+                    "proxy": session.proxy,
+                    "base_url": session.base_url,
+                    "created_at": session.created_at,
+                }
+            )
+        self.session_store.save_all(states)
 
     async def close_sessions(self):
         """
@@ -292,35 +680,37 @@ class TikTokApi:
         await self.browser.close()
         await self.playwright.stop()
 
-    def generate_js_fetch(self, method: str, url: str, headers: dict) -> str:
-        """Generate a javascript fetch function for use in playwright"""
+    def generate_js_fetch(
+        self, method: str, url: str, headers: dict, timeout: float = None
+    ) -> str:
+        """Generate a javascript fetch function for use in playwright, aborted after timeout seconds if given"""
         headers_js = json.dumps(headers)
+        timeout_ms = "null" if timeout is None else int(timeout * 1000)
         return f"""
             () => {{
                 return new Promise((resolve, reject) => {{
-                    fetch('{url}', {{ method: '{method}', headers: {headers_js} }})
+                    const controller = new AbortController();
+                    const timer = {timeout_ms} === null ? null : setTimeout(() => controller.abort(), {timeout_ms});
+                    fetch({json.dumps(url)}, {{ method: {json.dumps(method)}, headers: {headers_js}, signal: controller.signal }})
                         .then(response => response.text())
                         .then(data => resolve(data))
-                        .catch(error => reject(error.message));
+                        .catch(error => reject(error.message))
+                        .finally(() => clearTimeout(timer));
                 }});
             }}
         """
 
     def _get_session(self, **kwargs):
-        """Get a random session
+        """Get the least loaded healthy session
 
         Args:
-            session_index (int): The index of the session you want to use, if not provided a random session will be used.
+            session_index (int): The index of the session you want to use, if not provided the least loaded session will be used.
 
         Returns:
             int: The index of the session.
             TikTokPlaywrightSession: The session.
         """
-        if kwargs.get("session_index") is not None:
-            i = kwargs["session_index"]
-        else:
-            i = random.randint(0, self.num_sessions - 1)
-        return i, self.sessions[i]
+        return self.session_pool.pick(kwargs.get("session_index"))
 
     async def get_session_cookies(self, session):
         """
@@ -342,32 +732,55 @@ class TikTokApi:
         Args:
             url (str): The url to fetch.
             headers (dict): The headers to use for the fetch.
+            timeout (float): The maximum time in seconds the fetch may take before it's aborted.
 
         Returns:
             any: The result of the fetch. Seems to be a string or dict
         """
-        js_script = self.generate_js_fetch("GET", url, headers)
+        js_script = self.generate_js_fetch("GET", url, headers, kwargs.get("timeout"))
         _, session = self._get_session(**kwargs)
         result = await session.page.evaluate(js_script)
         return result
 
+    async def _wait_for_signer(
+        self, session: TikTokPlaywrightSession, timeout: float = None
+    ):
+        """Wait for TikTok's signer to load on a session, only polls the page once per session"""
+        if not session.signer_ready:
+            try:
+                await session.page.wait_for_function(
+                    "window.byted_acrawler !== undefined",
+                    timeout=None if timeout is None else timeout * 1000,
+                )
+            except PlaywrightTimeoutError:
+                raise TimeoutException(
+                    None, f"TikTok's signer didn't load within {timeout} seconds"
+                )
+            session.signer_ready = True
+
+    async def _evaluate_signer(
+        self, session: TikTokPlaywrightSession, script: str, arg, timeout: float = None
+    ):
+        """Evaluate a script that uses the signer, forgetting it's ready if the page lost it"""
+        await self._wait_for_signer(session, timeout)
+        try:
+            return await session.page.evaluate(script, arg)
+        except Exception as e:
+            # the page may have navigated and lost byted_acrawler, check again next time
+            if "TikTokApi request aborted" not in str(e):
+                session.signer_ready = False
+            raise
+
     async def generate_x_bogus(self, url: str, **kwargs):
         """Generate the X-Bogus header for a url"""
         _, session = self._get_session(**kwargs)
-        await session.page.wait_for_function("window.byted_acrawler !== undefined")
-        result = await session.page.evaluate(
-            f'() => {{ return window.byted_acrawler.frontierSign("{url}") }}'
+        return await self._evaluate_signer(
+            session, "(url) => window.byted_acrawler.frontierSign(url)", url
         )
-        return result
-
-    async def sign_url(self, url: str, **kwargs):
-        """Sign a url"""
-        i, session = self._get_session(**kwargs)
-
-        # TODO: Would be nice to generate msToken here
 
-        # Add X-Bogus to url
-        x_bogus = (await self.generate_x_bogus(url, session_index=i)).get("X-Bogus")
+    @staticmethod
+    def _add_x_bogus(url: str, x_bogus: str) -> str:
+        """Append an X-Bogus value to a url"""
         if x_bogus is None:
             raise Exception("Failed to generate X-Bogus")
 
@@ -375,9 +788,52 @@ class TikTokApi:
             url += "&"
         else:
             url += "?"
-        url += f"X-Bogus={x_bogus}"
+        return url + f"X-Bogus={x_bogus}"
+
+    async def _sign_urls(
+        self, session: TikTokPlaywrightSession, urls: list[str], timeout: float = None
+    ) -> list[str]:
+        """Sign urls on a specific session with a single evaluate"""
+        results = await self._evaluate_signer(
+            session,
+            "(urls) => urls.map((url) => window.byted_acrawler.frontierSign(url))",
+            urls,
+            timeout=timeout,
+        )
+        return [
+            self._add_x_bogus(url, result.get("X-Bogus"))
+            for url, result in zip(urls, results)
+        ]
+
+    async def sign_url(self, url: str, **kwargs):
+        """Sign a url"""
+        _, session = self._get_session(**kwargs)
+
+        # TODO: Would be nice to generate msToken here
+
+        return (await self._sign_urls(session, [url]))[0]
+
+    async def sign_urls(self, urls: list[str], **kwargs) -> list[str]:
+        """
+        Sign many urls with a single round trip to the browser.
+
+        Args:
+            urls (list[str]): The urls to sign.
+            session_index (int): The index of the session you want to use, if not provided the least loaded session will be used.
+
+        Returns:
+            list[str]: The signed urls, in the same order as urls.
+
+        Example Usage:
+            .. code-block:: python
+
+                signed_urls = await api.sign_urls([url_page_1, url_page_2])
+        """
+        if len(urls) == 0:
+            return []
 
-        return url
+        _, session = self._get_session(**kwargs)
+        return await self._sign_urls(session, urls)
 
     async def make_request(
         self,
@@ -386,6 +842,8 @@ class TikTokApi:
         params: dict = None,
         retries: int = 3,
         exponential_backoff: bool = True,
+        timeout: float = None,
+        deadline: float = None,
         **kwargs,
     ):
         """
@@ -397,17 +855,239 @@ class TikTokApi:
             params (dict): The params to use for the request.
             retries (int): The amount of times to retry the request if it fails.
             exponential_backoff (bool): Whether or not to use exponential backoff when retrying the request.
-            session_index (int): The index of the session you want to use, if not provided a random session will be used.
+            timeout (float): The maximum time in seconds a single attempt may take before it's aborted in the page and retried.
+            deadline (float): A time.time() timestamp the whole request, including waiting for a session and retries, must finish by.
+            hedge (bool): Whether the request may be hedged on another session when the api has a hedge_policy, defaults to True.
+            coalesce (bool): Whether to share the result of an identical request that's already in flight instead of making another one, defaults to True. The shared response dict must not be modified.
+            cache (bool): Whether the api's response cache may answer the request, defaults to True.
+            affinity (SessionAffinity): Keeps the request on the same session as earlier requests of a pagination, see SessionAffinity.
+            session_index (int): The index of the session you want to use, if not provided the least loaded session will be used.
 
         Returns:
             dict: The json response from TikTok.
 
         Raises:
+            CaptchaException: If TikTok showed a captcha on every session tried.
+            EmptyResponseException: If TikTok returned an empty response on every session tried.
+            InvalidJSONException: If TikTok returned invalid JSON on every session tried.
+            TimeoutException: If every attempt timed out or the deadline passed.
             Exception: If the request fails.
+
+        Example Usage:
+            .. code-block:: python
+
+                data = await api.make_request(url, params=params, timeout=10, deadline=time.time() + 30)
+        """
+        session_index = kwargs.get("session_index")
+        leased = []
+
+        async def attempt(n):
+            # A hedge avoids the sessions the original request is using
+            return await self.__make_request_on_pool(
+                url,
+                headers,
+                params,
+                retries,
+                exponential_backoff,
+                timeout,
+                deadline,
+                session_index,
+                leased=leased,
+                avoid=list(leased) if n > 0 else None,
+                affinity=kwargs.get("affinity") if n == 0 else None,
+            )
+
+        def flight():
+            return self._hedged(
+                urlparse(url).path,
+                attempt,
+                hedge=kwargs.get("hedge", True) and session_index is None,
+            )
+
+        def start():
+            if kwargs.get("coalesce", True) and session_index is None:
+                # Identical requests already in flight share one round trip, the first caller's timeouts apply to it
+                key = (request_key(url, params), tuple(sorted((headers or {}).items())))
+                return self.singleflight.do(key, flight)
+            return flight()
+
+        remaining = self._time_left(deadline)
+        if self.cache is not None and kwargs.get("cache", True) and session_index is None:
+            request = self.__cached_request(url, params, start)
+        else:
+            request = start()
+        try:
+            return await asyncio.wait_for(request, remaining)
+        except asyncio.TimeoutError:
+            raise TimeoutException(None, "The request didn't finish before its deadline")
+
+    async def __cached_request(self, url: str, params: dict, start):
+        """Answer a request from the cache, making it with start() on a miss"""
+        ttl = self.cache.ttl_for(url)
+        if ttl is None:
+            return await start()
+
+        key = request_key(url, params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            data, fresh = cached
+            if not fresh and key not in self.cache.revalidating:
+                self.cache.revalidating.add(key)
+                self._start_background_task(self.__revalidate(key, ttl, start))
+            return data
+
+        data = await start()
+        if data.get("status_code", 0) == 0:
+            self.cache.set(key, data, ttl)
+        return data
+
+    async def __revalidate(self, key: str, ttl: float, start):
+        """Refresh a stale cached response in the background"""
+        try:
+            data = await start()
+            if data.get("status_code", 0) == 0:
+                self.cache.set(key, data, ttl)
+        except Exception as e:
+            self.logger.info(f"Failed to refresh a stale cached response: {e}")
+        finally:
+            self.cache.revalidating.discard(key)
+
+    async def _hedged(self, endpoint: str, attempt, hedge: bool = True):
+        """Run attempt(0), hedging it with attempt(1) if the hedge_policy says it's slow"""
+        if not hedge or self.hedge_policy is None or len(self.sessions) < 2:
+            return await attempt(0)
+        return await self.hedge_policy.run(endpoint, attempt)
+
+    def __endpoint_slot(self, url: str):
+        """Hold the adaptive concurrency limiter's slot for a request's endpoint, taken before leasing a session"""
+        if self.concurrency_limiter is None:
+            return contextlib.AsyncExitStack()
+        return self.concurrency_limiter.endpoint_slot(urlparse(url).path)
+
+    @contextlib.asynccontextmanager
+    async def __request_slot(self, session: TikTokPlaywrightSession):
+        """Hold the adaptive concurrency limiter's slot for a session's proxy and record the request's outcome for the proxy pool"""
+        if self.concurrency_limiter is None:
+            slot = contextlib.AsyncExitStack()
+        else:
+            slot = self.concurrency_limiter.proxy_slot(
+                HTTPTransport.proxy_url(session.proxy)
+            )
+        async with slot:
+            start = time.monotonic()
+            try:
+                yield
+            except Exception as e:
+                # A non-zero status code still means the proxy got an answer through
+                self._record_proxy(
+                    session.proxy, time.monotonic() - start, isinstance(e, FailedLease)
+                )
+                raise
+            else:
+                self._record_proxy(session.proxy, time.monotonic() - start, True)
+
+    def _record_proxy(self, proxy, latency: float, success: bool):
+        """Record the outcome of a request for the proxy pool, if there is one"""
+        if self.proxy_pool is not None:
+            self.proxy_pool.record(proxy, latency, success)
+
+    @staticmethod
+    def _time_left(deadline: float) -> float:
+        """Seconds until a deadline, None if there's no deadline"""
+        if deadline is None:
+            return None
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise TimeoutException(None, "The request didn't finish before its deadline")
+        return remaining
+
+    def _attempt_timeout(self, timeout: float, deadline: float) -> float:
+        """The timeout for a single fetch, never running past the deadline"""
+        remaining = self._time_left(deadline)
+        if remaining is None or timeout is None:
+            return timeout if remaining is None else remaining
+        return min(timeout, remaining)
+
+    async def __make_request_on_pool(
+        self,
+        url: str,
+        headers: dict,
+        params: dict,
+        retries: int,
+        exponential_backoff: bool,
+        timeout: float,
+        deadline: float,
+        session_index: int,
+        leased: list = None,
+        avoid: list = None,
+        affinity: SessionAffinity = None,
+    ):
+        """Lease sessions for a request, moving to another session if one fails"""
+        failed_sessions = []
+        attempts = 1 if session_index is not None else min(retries, len(self.sessions))
+        attempts = max(attempts, 1)
+        while True:
+            # retries is one budget shared by every session, each session gets a
+            # single try and the last one gets whatever is left
+            if len(failed_sessions) < attempts - 1:
+                session_retries = 1
+            else:
+                session_retries = retries - len(failed_sessions)
+            if self.rate_limiter is not None:
+                # Shared limits are waited for before leasing, so throttled
+                # requests don't hold sessions other endpoints could use
+                await self.rate_limiter.acquire_shared(url)
+            try:
+                async with self.__endpoint_slot(url):
+                    async with self.session_pool.acquire(
+                        session_index,
+                        exclude=failed_sessions + (avoid or []),
+                        affinity=affinity,
+                    ) as (i, session):
+                        if leased is not None:
+                            leased.append(session)
+                        async with self.__request_slot(session):
+                            data = await self.__make_request(
+                                session,
+                                i,
+                                url,
+                                headers,
+                                params,
+                                session_retries,
+                                exponential_backoff,
+                                timeout,
+                                deadline,
+                            )
+                            if data.get("status_code", 0) != 0:
+                                # Still handed back, but counts against the session's health
+                                raise FailedLease(data)
+                            return data
+            except FailedLease as e:
+                return e.result
+            except SESSION_FAILURES as e:
+                # The session is quarantined by the pool, retry transparently on another one
+                failed_sessions.append(session)
+                if len(failed_sessions) >= attempts:
+                    raise
+                self.logger.info(
+                    f"Request failed on a session ({e.message}), retrying on another session ({len(failed_sessions)}/{attempts})"
+                )
+
+    async def _prepare_request(
+        self,
+        session: TikTokPlaywrightSession,
+        url: str,
+        headers: dict = None,
+        params: dict = None,
+    ) -> tuple[str, dict]:
         """
-        i, session = self._get_session(**kwargs)
-        if session.params is not None:
-            params = {**session.params, **params}
+        Build the unsigned url and headers for a request on a session.
+
+        Returns:
+            str: The url with the session's params and msToken encoded into it.
+            dict: The headers to send, the session's headers merged with headers.
+        """
+        params = {**(session.params or {}), **(params or {})}
 
         if headers is not None:
             headers = {**session.headers, **headers}
@@ -429,50 +1109,307 @@ class TikTokApi:
                     )
                 params["msToken"] = ms_token
 
-        encoded_params = f"{url}?{urlencode(params, safe='=', quote_via=quote)}"
-        signed_url = await self.sign_url(encoded_params, session_index=i)
+        return f"{url}?{urlencode(params, safe='=', quote_via=quote)}", headers
+
+    def _parse_response(self, result: str) -> dict:
+        """
+        Parse the body returned by a transport.
+
+        Raises:
+            EmptyResponseException: If TikTok returned an empty response.
+            CaptchaException: If TikTok returned a captcha or verification page.
+            json.decoder.JSONDecodeError: If the body isn't valid json, these requests can be retried.
+        """
+        if result is None:
+            raise Exception("TikTokApi.transport.fetch returned None")
+
+        if result == "":
+            raise EmptyResponseException(result, "TikTok returned an empty response")
+
+        try:
+            data = json.loads(result)
+        except json.decoder.JSONDecodeError:
+            if any(marker in result.lower() for marker in CAPTCHA_MARKERS):
+                raise CaptchaException(result, "TikTok is showing a captcha")
+            raise
+
+        if any(key in data for key in CAPTCHA_KEYS):
+            raise CaptchaException(result, "TikTok is showing a captcha")
+        if data.get("status_code") != 0:
+            self.logger.error(f"Got an unexpected status code: {data}")
+        return data
+
+    async def _backoff(self, retry_count: int, exponential_backoff: bool):
+        """Sleep before retrying a failed request"""
+        if exponential_backoff:
+            await asyncio.sleep(2**retry_count)
+        else:
+            await asyncio.sleep(1)
+
+    async def __make_request(
+        self,
+        session: TikTokPlaywrightSession,
+        i: int,
+        url: str,
+        headers: dict,
+        params: dict,
+        retries: int,
+        exponential_backoff: bool,
+        timeout: float = None,
+        deadline: float = None,
+    ):
+        """Make a request on a session that has already been leased from the pool"""
+        encoded_params, headers = await self._prepare_request(
+            session, url, headers, params
+        )
 
         retry_count = 0
         while retry_count < retries:
             retry_count += 1
-            result = await self.run_fetch_script(
-                signed_url, headers=headers, session_index=i
+            if self.rate_limiter is not None:
+                if retry_count > 1:
+                    # The first attempt's shared tokens were taken before leasing
+                    await self.rate_limiter.acquire_shared(url)
+                await self.rate_limiter.acquire_session(id(session))
+            result = await self.transport.fetch(
+                session,
+                encoded_params,
+                headers,
+                timeout=self._attempt_timeout(timeout, deadline),
             )
 
-            if result is None:
-                raise Exception("TikTokApi.run_fetch_script returned None")
-
-            if result == "":
-                raise EmptyResponseException(result, "TikTok returned an empty response")
-
             try:
-                data = json.loads(result)
-                if data.get("status_code") != 0:
-                    self.logger.error(f"Got an unexpected status code: {data}")
-                return data
+                return self._parse_response(result)
             except json.decoder.JSONDecodeError:
                 if retry_count == retries:
                     self.logger.error(f"Failed to decode json response: {result}")
-                    raise InvalidJSONException()
+                    raise InvalidJSONException(result, "TikTok returned invalid JSON")
 
                 self.logger.info(
                     f"Failed a request, retrying ({retry_count}/{retries})"
                 )
-                if exponential_backoff:
-                    await asyncio.sleep(2**retry_count)
-                else:
-                    await asyncio.sleep(1)
+                await self._backoff(retry_count, exponential_backoff)
+
+    async def make_requests(
+        self,
+        requests: list[dict],
+        batch_size: int = 50,
+        concurrency: int = 10,
+        retries: int = 3,
+        exponential_backoff: bool = True,
+        timeout: float = None,
+        deadline: float = None,
+        **kwargs,
+    ) -> list:
+        """
+        Makes many requests to TikTok, executing each batch concurrently on one session.
+
+        Each batch is signed and fetched with a single round trip to the
+        browser, batches are spread over the session pool. Requests that fail
+        with invalid JSON are retried individually with make_request.
+
+        Args:
+            requests (list[dict]): The requests to make, each a dict with a url and optionally headers and params, the same as make_request.
+            batch_size (int): The maximum amount of requests sent to a single session at once.
+            concurrency (int): The maximum amount of fetches running at once inside a session, capped at max_concurrency_per_session.
+            retries (int): The amount of times to try each request.
+            exponential_backoff (bool): Whether or not to use exponential backoff when retrying requests.
+            timeout (float): The maximum time in seconds a single request may take before it's aborted in the page.
+            deadline (float): A time.time() timestamp every request must finish by, requests still running then fail with TimeoutException.
+            session_index (int): The index of the session you want to use, if not provided batches are spread over the least loaded sessions.
+
+        Returns:
+            list: The json response for each request in order, or the exception raised for that request.
+
+        Example Usage:
+            .. code-block:: python
+
+                results = await api.make_requests([
+                    {"url": "https://www.tiktok.com/api/user/detail/", "params": {"uniqueId": "therock"}},
+                    {"url": "https://www.tiktok.com/api/user/detail/", "params": {"uniqueId": "tiktok"}},
+                ])
+        """
+        chunks = [
+            requests[start : start + batch_size]
+            for start in range(0, len(requests), batch_size)
+        ]
+        batches = await asyncio.gather(
+            *(
+                self.__make_batch_request(
+                    chunk,
+                    concurrency,
+                    retries,
+                    exponential_backoff,
+                    timeout,
+                    deadline,
+                    **kwargs,
+                )
+                for chunk in chunks
+            ),
+            return_exceptions=True,
+        )
+
+        results = []
+        for chunk, batch in zip(chunks, batches):
+            if isinstance(batch, BaseException):
+                # Every item of a batch that failed outright gets its error
+                batch = [batch] * len(chunk)
+            results.extend(batch)
+        return results
+
+    async def __make_batch_request(
+        self,
+        requests: list[dict],
+        concurrency: int,
+        retries: int,
+        exponential_backoff: bool,
+        timeout: float,
+        deadline: float,
+        **kwargs,
+    ) -> list:
+        """Make a batch of requests on one session, retrying items that failed"""
+        try:
+            remaining = self._time_left(deadline)
+            results, retry = await asyncio.wait_for(
+                self.__run_batch(requests, concurrency, retries, timeout, deadline, **kwargs),
+                remaining,
+            )
+        except FailedLease as e:
+            results, retry = e.result
+        except (asyncio.TimeoutError, TimeoutException):
+            error = TimeoutException(None, "The request didn't finish before its deadline")
+            return [error] * len(requests)
+        except Exception as e:
+            # The whole batch failed, eg. its page closed, so retry every item on its own
+            if retries <= 1:
+                return [e] * len(requests)
+            self.logger.info(f"A batch of {len(requests)} requests failed ({e}), retrying them")
+            results = [None] * len(requests)
+            retry = list(range(len(requests)))
+
+        if len(retry) > 0:
+            self.logger.info(
+                f"Failed {len(retry)} requests in a batch, retrying (1/{retries})"
+            )
+            await self._backoff(1, exponential_backoff)
+            retried = await asyncio.gather(
+                *(
+                    self.make_request(
+                        **requests[index],
+                        retries=retries - 1,
+                        exponential_backoff=exponential_backoff,
+                        timeout=timeout,
+                        deadline=deadline,
+                    )
+                    for index in retry
+                ),
+                return_exceptions=True,
+            )
+            for index, result in zip(retry, retried):
+                results[index] = result
+
+        return results
+
+    async def __run_batch(
+        self,
+        requests: list[dict],
+        concurrency: int,
+        retries: int,
+        timeout: float = None,
+        deadline: float = None,
+        **kwargs,
+    ) -> tuple[list, list]:
+        """Fetch and parse a batch on one leased session, returning the results and the indexes to retry"""
+        if self.rate_limiter is not None:
+            for request in requests:
+                await self.rate_limiter.acquire_shared(request["url"])
+        # The batch runs this many fetches at once, each counts towards the session's cap
+        concurrency = max(
+            1,
+            min(
+                concurrency,
+                len(requests),
+                self.session_pool.max_concurrency_per_session,
+            ),
+        )
+        async with self.session_pool.acquire(
+            kwargs.get("session_index"), weight=concurrency
+        ) as (i, session):
+            prepared = []
+            for request in requests:
+                prepared.append(
+                    await self._prepare_request(
+                        session,
+                        request["url"],
+                        request.get("headers"),
+                        request.get("params"),
+                    )
+                )
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire_session(id(session))
+
+            raw_results = await self.transport.fetch_many(
+                session,
+                prepared,
+                concurrency,
+                timeout=self._attempt_timeout(timeout, deadline),
+            )
+
+            results = []
+            retry = []
+            session_failed = False
+            for index, result in enumerate(raw_results):
+                if isinstance(result, Exception):
+                    results.append(result)
+                    continue
+                try:
+                    results.append(self._parse_response(result))
+                except (json.decoder.JSONDecodeError, *SESSION_FAILURES) as e:
+                    session_failed = session_failed or isinstance(e, SESSION_FAILURES)
+                    if retries <= 1:
+                        if isinstance(e, json.decoder.JSONDecodeError):
+                            self.logger.error(f"Failed to decode json response: {result}")
+                            e = InvalidJSONException(result, "TikTok returned invalid JSON")
+                        results.append(e)
+                    else:
+                        results.append(None)
+                        retry.append(index)
+                except Exception as e:
+                    results.append(e)
+
+            if session_failed:
+                # Let the pool count the failure so the session can be quarantined
+                raise FailedLease((results, retry), quarantine=True)
+            return results, retry
+
+    async def _close_session(self, session: TikTokPlaywrightSession):
+        """Remove a session from the pool and close it"""
+        if session in self.sessions:
+            self.sessions.remove(session)
+        await session.page.close()
+        await session.context.close()
+        await self.transport.close_session(session)
+        if self.rate_limiter is not None:
+            self.rate_limiter.forget(id(session))
+        if self.proxy_pool is not None:
+            self.proxy_pool.remove_session(session.proxy)
 
     async def close_sessions(self):
         """Close all the sessions. Should be called when you're done with the TikTokApi object"""
-        for session in self.sessions:
-            await session.page.close()
-            await session.context.close()
-        self.sessions.clear()
+        for task in list(self._background_tasks):
+            task.cancel()
+        if self.session_store is not None and len(self.sessions) > 0:
+            await self.save_sessions()
+
+        for session in list(self.sessions):
+            await self._close_session(session)
+        await self.transport.close()
 
     async def stop_playwright(self):
-        """Stop the playwright browser"""
-        await self.browser.close()
+        """Stop the playwright browsers"""
+        for browser in self.browsers:
+            await browser.close()
+        self.browsers = []
         await self.playwright.stop()
 
     async def get_session_content(self, url: str, **kwargs):
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+from typing import TYPE_CHECKING
+
+from .exceptions import TimeoutException
+from .helpers import proxy_url
+
+if TYPE_CHECKING:
+    from .tiktok import TikTokApi, TikTokPlaywrightSession
+
+# Extra time given to the browser to report an in-page timeout before giving up on it
+_TIMEOUT_GRACE = 1.0
+
+# Headers the browser sets itself which shouldn't be replayed by another client
+_SKIPPED_HEADERS = {"host", "content-length", "connection", "cookie", "accept-encoding"}
+
+
+class Transport:
+    """Signs and sends requests to TikTok on behalf of a session"""
+
+    def __init__(self, api: TikTokApi):
+        self.api = api
+
+    async def fetch(
+        self,
+        session: TikTokPlaywrightSession,
+        url: str,
+        headers: dict,
+        timeout: float = None,
+    ) -> str:
+        """
+        Sign and fetch a url.
+
+        Args:
+            session (TikTokPlaywrightSession): The session to make the request as.
+            url (str): The unsigned url to fetch, X-Bogus is added by the transport.
+            headers (dict): The headers to send with the request.
+            timeout (float): The maximum time in seconds the request may take.
+
+        Returns:
+            str: The body of the response.
+
+        Raises:
+            TimeoutException: If the request took longer than timeout.
+        """
+        raise NotImplementedError
+
+    async def fetch_many(
+        self,
+        session: TikTokPlaywrightSession,
+        requests: list[tuple[str, dict]],
+        concurrency: int,
+        timeout: float = None,
+    ) -> list:
+        """
+        Sign and fetch many urls concurrently on one session.
+
+        Args:
+            session (TikTokPlaywrightSession): The session to make the requests as.
+            requests (list[tuple[str, dict]]): The unsigned url and headers of each request.
+            concurrency (int): The maximum amount of requests in flight at once.
+            timeout (float): The maximum time in seconds each request may take.
+
+        Returns:
+            list: The body of each response in order, or the exception that request raised.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(url, headers):
+            async with semaphore:
+                return await self.fetch(session, url, headers, timeout=timeout)
+
+        return await asyncio.gather(
+            *(fetch(url, headers) for url, headers in requests),
+            return_exceptions=True,
+        )
+
+    async def close_session(self, session: TikTokPlaywrightSession):
+        """Release any resources held for a session"""
+
+    async def close(self):
+        """Release every resource held by the transport"""
+
+
+class PlaywrightTransport(Transport):
+    """
+    Runs each request inside the session's browser page.
+
+    Signing and fetching happen in a single evaluate of the request executor
+    that is installed on every page when its session is created, with the url
+    and headers passed as arguments instead of being spliced into a script.
+
+    Timeouts are enforced inside the page with an AbortController, and a
+    request cancelled from asyncio is aborted in the page as well.
+    """
+
+    def __init__(self, api: TikTokApi):
+        super().__init__(api)
+        self._request_ids = itertools.count()
+
+    async def __evaluate(
+        self,
+        session: TikTokPlaywrightSession,
+        script: str,
+        args: dict,
+        timeout: float,
+        batch_timeout: float = None,
+    ):
+        """Evaluate a request executor script, aborting it in the page if it's cancelled or hangs"""
+        request_id = next(self._request_ids)
+        args = {**args, "id": request_id, "timeout": None}
+        if timeout is not None:
+            args["timeout"] = max(1, int(timeout * 1000))
+        total_timeout = batch_timeout if batch_timeout is not None else timeout
+
+        try:
+            return await asyncio.wait_for(
+                self.api._evaluate_signer(session, script, args, timeout=timeout),
+                None if total_timeout is None else total_timeout + _TIMEOUT_GRACE,
+            )
+        except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+            self.api._start_background_task(self.__abort(session, request_id))
+            if isinstance(e, asyncio.TimeoutError):
+                raise TimeoutException(None, f"Request timed out after {timeout} seconds")
+            raise
+        except Exception as e:
+            if "TikTokApi request aborted" in str(e):
+                raise TimeoutException(None, f"Request timed out after {timeout} seconds")
+            raise
+
+    async def __abort(self, session: TikTokPlaywrightSession, request_id: int):
+        try:
+            await session.page.evaluate(
+                "(id) => window.__tiktokApi && window.__tiktokApi.abort(id)", request_id
+            )
+        except Exception:
+            # The page may already be closed, in which case the fetch is gone too
+            pass
+
+    async def fetch(
+        self,
+        session: TikTokPlaywrightSession,
+        url: str,
+        headers: dict,
+        timeout: float = None,
+    ) -> str:
+        return await self.__evaluate(
+            session,
+            "(args) => window.__tiktokApi.request(args)",
+            {"url": url, "headers": headers},
+            timeout,
+        )
+
+    async def fetch_many(
+        self,
+        session: TikTokPlaywrightSession,
+        requests: list[tuple[str, dict]],
+        concurrency: int,
+        timeout: float = None,
+    ) -> list:
+        # Every item gets the full timeout, but queued items wait for a free slot first
+        waves = -(-len(requests) // max(1, concurrency))
+        results = await self.__evaluate(
+            session,
+            "(args) => window.__tiktokApi.requestMany(args)",
+            {
+                "requests": [
+                    {"url": url, "headers": headers} for url, headers in requests
+                ],
+                "concurrency": concurrency,
+            },
+            timeout,
+            batch_timeout=None if timeout is None else timeout * waves,
+        )
+        return [
+            (
+                TimeoutException(None, result["error"])
+                if "TikTokApi request aborted" in result["error"]
+                else Exception(result["error"])
+            )
+            if "error" in result
+            else result["body"]
+            for result in results
+        ]
+
+
+class HTTPTransport(Transport):
+    """
+    Runs each request through a pooled async HTTP client outside of the browser.
+
+    The browser is still used to sign urls and to obtain the msToken, but the
+    response body no longer travels back over the devtools protocol. Each
+    session gets its own keep-alive client that reuses the session's headers,
+    cookies and proxy.
+
+    Requires the optional httpx dependency, install it with ``pip install TikTokApi[http]``.
+    """
+
+    def __init__(self, api: TikTokApi, timeout: float = 30.0):
+        """
+        Create a HTTPTransport.
+
+        Args:
+            api (TikTokApi): The TikTokApi instance the transport belongs to.
+            timeout (float): The timeout in seconds for each request.
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError(
+                "The http transport requires httpx, install it with `pip install TikTokApi[http]`"
+            )
+
+        super().__init__(api)
+        self.httpx = httpx
+        self.timeout = timeout
+        self.clients = {}
+
+    proxy_url = staticmethod(proxy_url)
+
+    @staticmethod
+    def _filter_headers(headers: dict) -> dict:
+        return {
+            k: v
+            for k, v in (headers or {}).items()
+            if k.lower() not in _SKIPPED_HEADERS and not k.startswith(":")
+        }
+
+    async def _get_client(self, session: TikTokPlaywrightSession):
+        client = self.clients.get(id(session))
+        if client is None:
+            cookies = await self.api.get_session_cookies(session)
+            client = self.httpx.AsyncClient(
+                cookies=cookies,
+                proxy=self.proxy_url(session.proxy),
+                timeout=self.timeout,
+                http2=False,
+            )
+            self.clients[id(session)] = client
+        return client
+
+    async def __get(self, client, url: str, headers: dict, timeout: float) -> str:
+        try:
+            response = await client.get(
+                url,
+                headers=self._filter_headers(headers),
+                timeout=self.timeout if timeout is None else timeout,
+            )
+        except self.httpx.TimeoutException:
+            raise TimeoutException(None, f"Request timed out after {timeout} seconds")
+        return response.text
+
+    async def fetch(
+        self,
+        session: TikTokPlaywrightSession,
+        url: str,
+        headers: dict,
+        timeout: float = None,
+    ) -> str:
+        url = (await self.api._sign_urls(session, [url], timeout=timeout))[0]
+        client = await self._get_client(session)
+        return await self.__get(client, url, headers, timeout)
+
+    async def fetch_many(
+        self,
+        session: TikTokPlaywrightSession,
+        requests: list[tuple[str, dict]],
+        concurrency: int,
+        timeout: float = None,
+    ) -> list:
+        # Sign the whole batch in one round trip, then fetch outside of the browser
+        signed_urls = await self.api._sign_urls(
+            session, [url for url, _ in requests], timeout=timeout
+        )
+        client = await self._get_client(session)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(url, headers):
+            async with semaphore:
+                return await self.__get(client, url, headers, timeout)
+
+        return await asyncio.gather(
+            *(fetch(url, headers) for url, (_, headers) in zip(signed_urls, requests)),
+            return_exceptions=True,
+        )
+
+    async def close_session(self, session: TikTokPlaywrightSession):
+        client = self.clients.pop(id(session), None)
+        if client is not None:
+            await client.aclose()
+
+    async def close(self):
+        for client in self.clients.values():
+            await client.aclose()
+        self.clients.clear()
+
+
+TRANSPORTS = {
+    "playwright": PlaywrightTransport,
+    "http": HTTPTransport,
+}
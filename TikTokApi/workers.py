@@ -0,0 +1,394 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+from typing import AsyncIterator, Optional
+
+from . import exceptions
+
+_STOP = None
+
+# How often in seconds blocking queue reads wake up to check on the worker processes
+_POLL_INTERVAL = 0.5
+
+
+def _exception_payload(e: Exception) -> tuple:
+    """The picklable parts of an exception, so it can be rebuilt in the parent"""
+    if isinstance(e, exceptions.TikTokException):
+        return (type(e).__name__, e.message, e.error_code)
+    return (type(e).__name__, str(e), None)
+
+
+def _rebuild_exception(name: str, message: str, error_code=None) -> Exception:
+    """Recreate an exception raised in a worker from its class name, message and error code"""
+    exception_class = getattr(exceptions, name, None)
+    if isinstance(exception_class, type) and issubclass(
+        exception_class, exceptions.TikTokException
+    ):
+        return exception_class(None, message, error_code)
+    return Exception(f"{name}: {message}")
+
+
+async def _run_task(api, task: dict, result_queue, task_id: int):
+    """Run a single task in a worker, streaming its results back to the parent"""
+    try:
+        if task["type"] == "request":
+            result = await api.make_request(**task["request"])
+            result_queue.put((task_id, "item", result))
+        elif task["type"] == "iterate":
+            target = getattr(api, task["target"])
+            if task.get("init") is not None:
+                target = target(**task["init"])
+            method = getattr(target, task["method"])
+            async for item in method(*task.get("args", ()), **task.get("kwargs", {})):
+                result_queue.put((task_id, "item", getattr(item, "as_dict", item)))
+        else:
+            raise ValueError(f"Unknown task type: {task['type']}")
+        result_queue.put((task_id, "done", None))
+    except Exception as e:
+        result_queue.put((task_id, "error", _exception_payload(e)))
+
+
+async def _worker_main(
+    task_queue,
+    control_queue,
+    result_queue,
+    api_options: dict,
+    session_options: dict,
+    concurrency: int,
+):
+    from .tiktok import TikTokApi
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    running = {}
+    stopping = False
+
+    def next_cancel():
+        try:
+            return control_queue.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            return None
+
+    async def read_cancels():
+        # The parent asks to cancel tasks it stopped waiting on, eg. an iterator it broke out of
+        while not stopping:
+            task_id = await loop.run_in_executor(None, next_cancel)
+            future = running.get(task_id)
+            if future is not None:
+                future.cancel()
+
+    async with TikTokApi(**api_options) as api:
+        await api.create_sessions(**session_options)
+        result_queue.put((None, "ready", os.getpid()))
+        cancels = asyncio.ensure_future(read_cancels())
+
+        while True:
+            # Only take a task once there's capacity, so idle workers get the next one
+            await semaphore.acquire()
+            item = await loop.run_in_executor(None, task_queue.get)
+            if item is _STOP:
+                semaphore.release()
+                break
+
+            task_id, task = item
+            # Tells the parent which worker to send a cancel to, or whose death fails the task
+            result_queue.put((task_id, "started", os.getpid()))
+
+            async def run(task_id=task_id, task=task):
+                try:
+                    await _run_task(api, task, result_queue, task_id)
+                finally:
+                    semaphore.release()
+
+            future = asyncio.ensure_future(run())
+            running[task_id] = future
+            future.add_done_callback(lambda _, task_id=task_id: running.pop(task_id))
+
+        if len(running) > 0:
+            await asyncio.gather(*running.values(), return_exceptions=True)
+        stopping = True
+        await cancels
+
+
+def _worker_process(
+    task_queue, control_queue, result_queue, api_options, session_options, concurrency
+):
+    try:
+        asyncio.run(
+            _worker_main(
+                task_queue,
+                control_queue,
+                result_queue,
+                api_options,
+                session_options,
+                concurrency,
+            )
+        )
+    except Exception as e:
+        result_queue.put((None, "failed", _exception_payload(e)))
+
+
+class WorkerPool:
+    """
+    Runs requests across several processes, each with its own browser and session pool.
+
+    Tasks are put on a shared queue that every worker takes from, and results
+    are streamed back to the parent as they're produced. Items from iterators
+    are returned as their raw as_dict data since TikTokApi objects can't move
+    between processes.
+
+    Example Usage:
+        .. code-block:: python
+
+            from TikTokApi.workers import WorkerPool
+
+            async with WorkerPool(num_workers=8, session_options={"num_sessions": 5}) as pool:
+                user = await pool.request("https://www.tiktok.com/api/user/detail/", params={"uniqueId": "therock"})
+                async for video in pool.iterate("user", "videos", init={"username": "therock"}, count=100):
+                    print(video["id"])
+    """
+
+    def __init__(
+        self,
+        num_workers: Optional[int] = None,
+        session_options: Optional[dict] = None,
+        api_options: Optional[dict] = None,
+        concurrency_per_worker: int = 10,
+    ):
+        """
+        Create a WorkerPool.
+
+        Args:
+            num_workers (int): The amount of worker processes to start, defaults to the amount of CPU cores.
+            session_options (dict): The keyword arguments each worker passes to TikTokApi.create_sessions.
+            api_options (dict): The keyword arguments each worker passes to TikTokApi, they must be picklable.
+            concurrency_per_worker (int): The maximum amount of tasks a single worker runs at once.
+        """
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.session_options = session_options or {}
+        self.api_options = api_options or {}
+        self.concurrency_per_worker = concurrency_per_worker
+        self.logger = logging.getLogger(__name__)
+
+        self._context = multiprocessing.get_context("spawn")
+        self._processes = []
+        self._control_queues = {}
+        self._task_ids = itertools.count()
+        self._results = {}
+        # The pid of the worker running each task, and tasks cancelled before a worker took them
+        self._task_workers = {}
+        self._cancelled = set()
+        self._dead = set()
+        self._reader = None
+
+    async def start(self):
+        """Start the worker processes and wait for every worker's sessions to be created"""
+        self._task_queue = self._context.Queue()
+        self._result_queue = self._context.Queue()
+        for _ in range(self.num_workers):
+            control_queue = self._context.Queue()
+            process = self._context.Process(
+                target=_worker_process,
+                args=(
+                    self._task_queue,
+                    control_queue,
+                    self._result_queue,
+                    self.api_options,
+                    self.session_options,
+                    self.concurrency_per_worker,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+            self._control_queues[process.pid] = control_queue
+
+        loop = asyncio.get_running_loop()
+        ready = 0
+        while ready < self.num_workers:
+            try:
+                _, kind, payload = await loop.run_in_executor(None, self.__next_result)
+            except queue.Empty:
+                if any(not process.is_alive() for process in self._processes):
+                    await self.close()
+                    raise Exception("A worker process exited while starting")
+                continue
+            if kind == "failed":
+                await self.close()
+                raise _rebuild_exception(*payload)
+            ready += 1
+
+        self._reader = asyncio.ensure_future(self.__read_results())
+
+    def __next_result(self):
+        return self._result_queue.get(timeout=_POLL_INTERVAL)
+
+    async def __read_results(self):
+        """Route results from the workers to the task they belong to"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                task_id, kind, payload = await loop.run_in_executor(
+                    None, self.__next_result
+                )
+            except queue.Empty:
+                self.__check_workers()
+                continue
+            if kind == "closed":
+                return
+            if kind == "failed":
+                self.logger.error(f"A worker process failed: {payload}")
+                continue
+            if kind == "started":
+                self._task_workers[task_id] = payload
+                if task_id in self._cancelled:
+                    self._cancelled.discard(task_id)
+                    self.__cancel(task_id)
+                continue
+            if kind in ("done", "error"):
+                self._task_workers.pop(task_id, None)
+            results = self._results.get(task_id)
+            if results is not None:
+                results.put_nowait((kind, payload))
+            self.__check_workers()
+
+    def __check_workers(self):
+        """Fail the tasks of worker processes that died, and every pending task once none are left"""
+        alive = 0
+        for process in self._processes:
+            if process.is_alive():
+                alive += 1
+                continue
+            if process.pid in self._dead:
+                continue
+            self._dead.add(process.pid)
+            self.logger.error(
+                f"Worker process {process.pid} exited with code {process.exitcode}"
+            )
+            for task_id, pid in list(self._task_workers.items()):
+                if pid == process.pid:
+                    self.__fail(task_id, f"Worker process {pid} exited")
+
+        if alive == 0 and len(self._processes) > 0:
+            for task_id in list(self._results):
+                self.__fail(task_id, "Every worker process has exited")
+
+    def __fail(self, task_id: int, message: str):
+        self._task_workers.pop(task_id, None)
+        results = self._results.get(task_id)
+        if results is not None:
+            results.put_nowait(("lost", message))
+
+    def __cancel(self, task_id: int):
+        """Ask the worker running a task to stop it"""
+        pid = self._task_workers.pop(task_id, None)
+        if pid is None:
+            # Not taken by a worker yet, cancel it once one reports taking it
+            self._cancelled.add(task_id)
+            return
+        control_queue = self._control_queues.get(pid)
+        if control_queue is not None:
+            control_queue.put(task_id)
+
+    async def __submit(self, task: dict) -> AsyncIterator:
+        if self._reader is None:
+            raise Exception("The WorkerPool isn't running, call start() or use async with")
+        if not any(process.is_alive() for process in self._processes):
+            raise Exception("Every worker process has exited")
+
+        task_id = next(self._task_ids)
+        queue = asyncio.Queue()
+        self._results[task_id] = queue
+        self._task_queue.put((task_id, task))
+        finished = False
+        try:
+            while True:
+                kind, payload = await queue.get()
+                if kind == "item":
+                    yield payload
+                elif kind == "done":
+                    finished = True
+                    return
+                elif kind == "error":
+                    finished = True
+                    raise _rebuild_exception(*payload)
+                elif kind == "lost":
+                    finished = True
+                    raise Exception(payload)
+        finally:
+            self._results.pop(task_id, None)
+            if not finished:
+                # The caller stopped early, don't keep the worker producing items
+                self.__cancel(task_id)
+
+    async def request(
+        self, url: str, params: dict = None, headers: dict = None, **kwargs
+    ) -> dict:
+        """
+        Make a request on one of the workers, see TikTokApi.make_request.
+
+        Returns:
+            dict: The json response from TikTok.
+        """
+        request = {"url": url, "params": params, "headers": headers, **kwargs}
+        result = None
+        async for result in self.__submit({"type": "request", "request": request}):
+            pass
+        return result
+
+    async def iterate(
+        self, target: str, method: str, *args, init: dict = None, **kwargs
+    ) -> AsyncIterator[dict]:
+        """
+        Run one of TikTokApi's iterators on a worker, streaming back the raw data of each item.
+
+        Args:
+            target (str): The TikTokApi attribute to use, eg. "user", "hashtag" or "trending".
+            method (str): The method to call on it, eg. "videos".
+            init (dict): The keyword arguments to construct the object with, eg. {"username": "therock"}. Leave as None for static methods such as trending.videos.
+
+        Returns:
+            async iterator/generator: Yields the as_dict of each item.
+        """
+        task = {
+            "type": "iterate",
+            "target": target,
+            "method": method,
+            "init": init,
+            "args": args,
+            "kwargs": kwargs,
+        }
+        items = self.__submit(task)
+        try:
+            async for item in items:
+                yield item
+        finally:
+            # Closes the task right away when the caller breaks out early
+            await items.aclose()
+
+    async def close(self):
+        """Stop the worker processes once they finish the tasks they're running"""
+        for _ in self._processes:
+            self._task_queue.put(_STOP)
+
+        loop = asyncio.get_running_loop()
+        for process in self._processes:
+            await loop.run_in_executor(None, process.join)
+        self._processes = []
+        self._control_queues = {}
+
+        if self._reader is not None:
+            # Unblock the reader so its executor thread can exit
+            self._result_queue.put((None, "closed", None))
+            await self._reader
+            self._reader = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -19,6 +19,7 @@ setuptools.setup(
     download_url="https://github.com/davidteather/TikTok-Api/tarball/main",
     keywords=["tiktok", "python3", "api", "unofficial", "tiktok-api", "tiktok api"],
     install_requires=["requests", "playwright"],
+    extras_require={"http": ["httpx>=0.26"]},
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
@@ -0,0 +1,58 @@
+from TikTokApi.cache import ResponseCache
+from TikTokApi.helpers import request_key
+from tests.test_tiktok import make_api
+import asyncio
+import pytest
+import time
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResponseCache(default_ttl=60, max_entries=2)
+    cache.set("a", 1, 60)
+    cache.set("b", 2, 60)
+    cache.get("a")
+    cache.set("c", 3, 60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == (1, True)
+    assert cache.stats.hits == 2
+    assert cache.stats.misses == 1
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    ResponseCache(path=str(tmp_path)).set("a", {"n": 1}, 60)
+    cache = ResponseCache(path=str(tmp_path))
+
+    assert cache.get("a") == ({"n": 1}, True)
+    assert cache.stats.disk_hits == 1
+
+
+def test_keys_ignore_fingerprint_params():
+    assert request_key("/a", {"id": 1, "msToken": "x", "device_id": "1"}) == request_key(
+        "/a", {"id": 1, "msToken": "y"}
+    )
+
+
+@pytest.mark.asyncio
+async def test_stale_response_is_served_while_revalidating():
+    api = make_api(
+        {
+            "/api/user/detail/": [
+                '{"status_code": 0, "n": 1}',
+                '{"status_code": 0, "n": 2}',
+            ]
+        }
+    )
+    api.cache = ResponseCache(ttls={"/api/user/detail/": 60})
+
+    assert (await api.make_request("/api/user/detail/", params={"id": 1}))["n"] == 1
+    assert (await api.make_request("/api/user/detail/", params={"id": 1}))["n"] == 1
+    assert len(api.transport.urls) == 1
+
+    key = request_key("/api/user/detail/", {"id": 1})
+    api.cache.memory.entries[key]["expires_at"] = time.time() - 1
+    assert (await api.make_request("/api/user/detail/", params={"id": 1}))["n"] == 1
+    await asyncio.gather(*api._background_tasks)
+
+    assert (await api.make_request("/api/user/detail/", params={"id": 1}))["n"] == 2
+    assert api.cache.stats.stale_hits == 1
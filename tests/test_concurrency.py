@@ -0,0 +1,48 @@
+from TikTokApi.concurrency import AdaptiveConcurrencyLimiter, AdaptiveLimit
+import asyncio
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_limit_increases_additively_and_decreases_multiplicatively():
+    limit = AdaptiveLimit(initial=4, max_limit=8)
+
+    for _ in range(4):
+        await limit.acquire()
+    for _ in range(4):
+        await limit.release(True, 0.1)
+    assert 4.9 < limit.limit < 5
+
+    await limit.acquire()
+    await limit.release(False, 0.1)
+    assert 2.4 < limit.limit < 2.5
+
+    await limit.acquire()
+    await limit.release(None, 0.1)
+    assert 2.4 < limit.limit < 2.5
+    assert limit.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_caps_concurrency_per_endpoint_and_proxy():
+    limiter = AdaptiveConcurrencyLimiter(initial=2, max_latency=0)
+    running = 0
+    peak = 0
+
+    async def request(endpoint):
+        nonlocal running, peak
+        async with limiter.acquire(endpoint, "proxy-a"):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(request(f"/{i % 3}") for i in range(6)))
+    assert peak == 2
+
+    with pytest.raises(ValueError):
+        async with limiter.acquire("/0", "proxy-a"):
+            raise ValueError()
+    snapshot = limiter.snapshot()
+    assert snapshot["endpoints"]["/0"]["limit"] == 1
+    assert snapshot["proxies"]["proxy-a"]["limit"] == 1
@@ -0,0 +1,51 @@
+from TikTokApi.hedging import HedgePolicy, LatencyTracker
+import asyncio
+import pytest
+
+
+def test_latency_percentile():
+    tracker = LatencyTracker(window=100)
+    for latency in range(1, 101):
+        tracker.record("/a", latency / 100)
+
+    assert tracker.percentile("/a", 0.95) == 0.95
+    assert tracker.percentile("/b", 0.95) is None
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_and_cancelled():
+    policy = HedgePolicy(min_samples=5, budget=1, min_delay=0.01)
+    for _ in range(5):
+        policy.tracker.record("/a", 0.01)
+    cancelled = []
+
+    async def attempt(n):
+        try:
+            await asyncio.sleep(1 if n == 0 else 0)
+            return n
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+
+    assert await policy.run("/a", attempt) == 1
+    await asyncio.sleep(0)
+    assert cancelled == [0]
+    assert policy.hedges == 1
+    assert policy.hedge_wins == 1
+
+
+@pytest.mark.asyncio
+async def test_hedging_respects_budget():
+    policy = HedgePolicy(min_samples=1, budget=0.05, min_delay=0.01)
+    policy.tracker.record("/a", 0.01)
+    started = []
+
+    async def attempt(n):
+        started.append(n)
+        await asyncio.sleep(0.02)
+        return n
+
+    # 1 request only earns 5% of a hedge
+    assert await policy.run("/a", attempt) == 0
+    assert started == [0]
+    assert policy.hedges == 0
@@ -0,0 +1,346 @@
+from TikTokApi.pagination import Page, prefetch_pages
+from TikTokApi.transport import Transport
+from tests.test_tiktok import make_api
+import asyncio
+import json
+from urllib.parse import parse_qs, urlparse
+import pytest
+
+
+def make_fetch_page(pages, fetched):
+    async def fetch_page(cursor):
+        fetched.append(cursor)
+        await asyncio.sleep(0.01)
+        return Page(
+            [f"{cursor}-{i}" for i in range(2)],
+            cursor=cursor + 1,
+            has_more=cursor + 1 < pages,
+        )
+
+    return fetch_page
+
+
+@pytest.mark.asyncio
+async def test_prefetch_overlaps_with_consumer():
+    fetched = []
+    ahead = []
+    async for page in prefetch_pages(make_fetch_page(5, fetched), 0, depth=1):
+        await asyncio.sleep(0.02)
+        # pages requested beyond the one being consumed
+        ahead.append(len(fetched) - (page.cursor))
+
+    assert fetched == [0, 1, 2, 3, 4]
+    assert ahead == [1, 1, 1, 1, 0]
+
+
+@pytest.mark.asyncio
+async def test_prefetch_stops_at_count_and_when_consumer_stops():
+    fetched = []
+    async for _ in prefetch_pages(make_fetch_page(100, fetched), 0, count=5, depth=3):
+        pass
+    assert fetched == [0, 1, 2]
+
+    fetched = []
+    async for _ in prefetch_pages(make_fetch_page(100, fetched), 0, depth=2):
+        break
+    await asyncio.sleep(0.05)
+    assert len(fetched) <= 3
+
+
+@pytest.mark.asyncio
+async def test_hashtag_videos_are_prefetched():
+    pages = [
+        json.dumps(
+            {
+                "status_code": 0,
+                "itemList": [{"id": str(i)}],
+                "cursor": i + 1,
+                "hasMore": i < 2,
+            }
+        )
+        for i in range(3)
+    ]
+    api = make_api({"https://www.tiktok.com/api/challenge/item_list/": pages})
+    api.video = lambda data: data["id"]
+
+    videos = [v async for v in api.hashtag(id="1").videos(count=10, prefetch=2)]
+
+    assert videos == ["0", "1", "2"]
+
+
+def item_page(ids, cursor, has_more=True):
+    return json.dumps(
+        {
+            "status_code": 0,
+            "itemList": [{"id": str(i)} for i in ids],
+            "cursor": cursor,
+            "hasMore": has_more,
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_paginate_trims_to_count_and_sizes_pages():
+    api = make_api(
+        {
+            "https://www.tiktok.com/api/post/item_list/": [
+                item_page(range(35), 35),
+                item_page(range(35, 45), 45),
+            ]
+        }
+    )
+    api.video = lambda data: data["id"]
+
+    videos = [
+        v
+        async for v in api.user(sec_uid="x").videos(count=40, prefetch=0)
+    ]
+
+    assert videos == [str(i) for i in range(40)]
+    assert "count=35" in api.transport.urls[0]
+    assert "count=5" in api.transport.urls[1]
+
+
+@pytest.mark.asyncio
+async def test_paginate_stops_on_repeated_page():
+    api = make_api(
+        {
+            "https://www.tiktok.com/api/recommend/item_list/": [
+                item_page([1, 2], None),
+                item_page([2, 3], None),
+                item_page([2, 3], None),
+            ]
+        }
+    )
+    api.video = lambda data: data["id"]
+
+    videos = [v async for v in api.trending.videos(count=100, prefetch=0)]
+
+    assert videos == ["1", "2", "3"]
+    assert len(api.transport.urls) == 3
+
+
+class OffsetTransport(Transport):
+    """Serves a feed of total items by offset, like challenge/item_list"""
+
+    def __init__(self, api, total):
+        super().__init__(api)
+        self.total = total
+        self.requested = []
+
+    async def fetch(self, session, url, headers, timeout=None):
+        query = parse_qs(urlparse(url).query)
+        cursor, count = int(query["cursor"][0]), int(query["count"][0])
+        self.requested.append((cursor, count))
+        # later offsets answer first, so ordering has to be restored
+        await asyncio.sleep(0.05 / (1 + cursor))
+        ids = range(cursor, min(cursor + count, self.total))
+        return json.dumps(
+            {
+                "status_code": 0,
+                "itemList": [{"id": str(i)} for i in ids],
+                "cursor": cursor + count,
+                "hasMore": cursor + count < self.total,
+            }
+        )
+
+
+def make_sharded_api(total):
+    api = make_api({}, num_sessions=4)
+    api.transport = OffsetTransport(api, total)
+    api.video = lambda data: data["id"]
+    return api
+
+
+@pytest.mark.asyncio
+async def test_sharded_videos_are_ordered_and_trimmed():
+    api = make_sharded_api(1000)
+
+    videos = [
+        v async for v in api.hashtag(id="1").videos(count=200, shards=4)
+    ]
+
+    assert videos == [str(i) for i in range(200)]
+    # each of the 4 shards started at once on its own range of offsets
+    assert sorted(api.transport.requested[:4]) == [
+        (0, 35),
+        (35, 35),
+        (105, 35),
+        (140, 35),
+    ]
+    assert all(cursor < 200 for cursor, _ in api.transport.requested)
+
+
+@pytest.mark.asyncio
+async def test_sharded_videos_stop_at_end_of_feed():
+    api = make_sharded_api(50)
+
+    videos = [
+        v
+        async for v in api.hashtag(id="1").videos(
+            count=300, shards=4, ordered=False
+        )
+    ]
+
+    assert sorted(videos, key=int) == [str(i) for i in range(50)]
+
+
+class TimelineTransport(Transport):
+    """Serves post/item_list for posts at the given unix timestamps"""
+
+    def __init__(self, api, times, pinned=()):
+        super().__init__(api)
+        self.times = sorted(times, reverse=True)
+        self.pinned = pinned
+        self.requested = []
+
+    async def fetch(self, session, url, headers, timeout=None):
+        query = parse_qs(urlparse(url).query)
+        cursor, count = int(query["cursor"][0]), int(query["count"][0])
+        self.requested.append(cursor)
+        await asyncio.sleep(0.01)
+        older = [t for t in self.times if t * 1000 < cursor]
+        page = older[:count]
+        items = [
+            {"id": str(t), "createTime": t, "isPinnedItem": True} for t in self.pinned
+        ]
+        items += [{"id": str(t), "createTime": t} for t in page]
+        return json.dumps(
+            {
+                "status_code": 0,
+                "itemList": items,
+                "cursor": page[-1] * 1000 if page else cursor,
+                "hasMore": len(older) > count,
+            }
+        )
+
+
+@pytest.mark.asyncio
+async def test_time_sharded_videos_are_in_create_time_order():
+    day = 24 * 60 * 60
+    now = 1000 * day
+    # a busy year, then nothing for 3 years before the first posts
+    times = [now - i * day // 3 for i in range(1, 1000)]
+    times += [now - 1800 * day - i for i in range(5)]
+    api = make_api({}, num_sessions=4)
+    api.transport = TimelineTransport(api, times, pinned=[times[-1]])
+    api.video = lambda data: data["createTime"]
+
+    videos = [
+        v
+        async for v in api.user(sec_uid="x").videos(
+            count=5000, cursor=now * 1000, shards=4
+        )
+    ]
+
+    assert videos == sorted(times, reverse=True)
+    # the empty years are skipped instead of being requested month by month
+    assert len(api.transport.requested) < 60, len(api.transport.requested)
+
+
+@pytest.mark.asyncio
+async def test_time_sharded_videos_stop_at_count():
+    day = 24 * 60 * 60
+    now = 1000 * day
+    times = [now - i * day for i in range(1, 500)]
+    api = make_api({}, num_sessions=4)
+    api.transport = TimelineTransport(api, times)
+    api.video = lambda data: data["createTime"]
+
+    videos = [
+        v
+        async for v in api.user(sec_uid="x").videos(
+            count=40, cursor=now * 1000, shards=2
+        )
+    ]
+
+    assert videos == sorted(times, reverse=True)[:40]
+    # windows far older than the first 40 posts aren't fetched
+    assert min(api.transport.requested) > (now - 120 * day) * 1000
+
+
+@pytest.mark.asyncio
+async def test_since_and_until_stop_user_feed_early():
+    day = 24 * 60 * 60
+    now = 1000 * day
+    times = [now - i * day for i in range(1, 500)]
+    api = make_api({}, num_sessions=1)
+    # a pinned post far older than since mustn't end the feed
+    api.transport = TimelineTransport(api, times, pinned=[times[-1]])
+    api.video = lambda data: data["createTime"]
+
+    videos = [
+        v
+        async for v in api.user(sec_uid="x").videos(
+            count=1000, since=now - 50 * day, until=now - 10 * day, prefetch=0
+        )
+    ]
+
+    assert videos == [now - i * day for i in range(11, 51)]
+    # the feed starts at until and stops at the page that passes since
+    assert api.transport.requested[0] == (now - 10 * day) * 1000
+    assert len(api.transport.requested) == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_predicate_ends_any_feed():
+    api = make_api(
+        {
+            "https://www.tiktok.com/api/challenge/item_list/": [
+                item_page([1, 2, 3], 3),
+                item_page([4, 5, 6], 6),
+                item_page([7, 8, 9], 9),
+            ]
+        }
+    )
+    api.video = lambda data: data["id"]
+
+    videos = [
+        v
+        async for v in api.hashtag(id="1").videos(
+            count=100, stop=lambda item: item["id"] == "5", prefetch=0
+        )
+    ]
+
+    assert videos == ["1", "2", "3", "4"]
+    assert len(api.transport.urls) == 2
+
+
+@pytest.mark.asyncio
+async def test_since_bounds_time_sharded_windows():
+    day = 24 * 60 * 60
+    now = 1000 * day
+    times = [now - i * day for i in range(1, 900)]
+    api = make_api({}, num_sessions=4)
+    api.transport = TimelineTransport(api, times)
+    api.video = lambda data: data["createTime"]
+
+    videos = [
+        v
+        async for v in api.user(sec_uid="x").videos(
+            count=1000, until=now, since=now - 100 * day, shards=4
+        )
+    ]
+
+    assert videos == [now - i * day for i in range(1, 101)]
+    assert min(api.transport.requested) >= (now - 120 * day) * 1000
+
+
+@pytest.mark.asyncio
+async def test_time_sharded_videos_meet_count_with_pinned_post():
+    day = 24 * 60 * 60
+    now = 1000 * day
+    times = [now - i * day for i in range(1, 89)]
+    api = make_api({}, num_sessions=2)
+    # the pinned post repeats on every page of its window
+    api.transport = TimelineTransport(api, times, pinned=[times[3]])
+    api.video = lambda data: data["createTime"]
+
+    videos = [
+        v
+        async for v in api.user(sec_uid="x").videos(
+            count=40, cursor=now * 1000, shards=1, page_size=2
+        )
+    ]
+
+    assert videos == sorted(times, reverse=True)[:40]
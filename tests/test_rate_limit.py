@@ -0,0 +1,30 @@
+from TikTokApi.rate_limit import RateLimiter, TokenBucket
+import asyncio
+import time
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_queues_callers():
+    bucket = TokenBucket(rate=20, burst=1)
+    start = time.monotonic()
+    await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+
+    # the first token is available immediately, the next four refill at 20/s
+    assert time.monotonic() - start >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_scopes():
+    limiter = RateLimiter(
+        session_rate=(1000, 1),
+        endpoint_rates={"/api/comment/list/": (1000, 2)},
+    )
+    await limiter.acquire("https://www.tiktok.com/api/comment/list/?a=1", session_key=1)
+    await limiter.acquire("https://www.tiktok.com/api/user/detail/", session_key=2)
+
+    assert set(limiter.session_buckets) == {1, 2}
+    assert limiter.endpoint_buckets["/api/comment/list/"].tokens < 2
+
+    limiter.forget(1)
+    assert set(limiter.session_buckets) == {2}
@@ -0,0 +1,170 @@
+from TikTokApi.session_pool import (
+    FailedLease,
+    SessionAffinity,
+    SessionPool,
+    SessionStats,
+)
+from types import SimpleNamespace
+import asyncio
+import pytest
+
+
+def make_sessions(n):
+    return [SimpleNamespace(stats=SessionStats()) for _ in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_picks_least_loaded_session():
+    sessions = make_sessions(3)
+    pool = SessionPool(sessions, max_concurrency_per_session=2)
+
+    leases = []
+    for _ in range(3):
+        lease = pool.acquire()
+        leases.append(lease)
+        await lease.__aenter__()
+
+    assert [s.stats.in_flight for s in sessions] == [1, 1, 1]
+
+    for lease in leases:
+        await lease.__aexit__(None, None, None)
+
+    assert [s.stats.in_flight for s in sessions] == [0, 0, 0]
+    assert all(s.stats.requests == 1 for s in sessions)
+
+
+@pytest.mark.asyncio
+async def test_skips_unhealthy_session():
+    sessions = make_sessions(2)
+    pool = SessionPool(sessions, max_error_rate=0.5)
+    sessions[0].stats.error_rate = 0.9
+
+    i, _ = pool.pick()
+    assert i == 1
+
+    with pytest.raises(ValueError):
+        async with pool.acquire() as (i, session):
+            assert i == 1
+            raise ValueError()
+
+    assert sessions[1].stats.errors == 1
+    assert sessions[1].stats.consecutive_errors == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_queues_requests():
+    sessions = make_sessions(1)
+    pool = SessionPool(sessions, max_concurrency_per_session=1)
+    running = 0
+    peak = 0
+
+    async def request():
+        nonlocal running, peak
+        async with pool.acquire():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(request() for _ in range(5)))
+
+    assert peak == 1
+    assert sessions[0].stats.requests == 5
+
+
+@pytest.mark.asyncio
+async def test_scale_decision():
+    sessions = make_sessions(2)
+    pool = SessionPool(sessions, max_concurrency_per_session=1)
+
+    assert pool.scale_decision(3, 5, scale_up_wait=0, idle_timeout=60) == 1
+    assert pool.scale_decision(1, 5, scale_up_wait=0, idle_timeout=60) == 0
+    assert pool.scale_decision(1, 5, scale_up_wait=0, idle_timeout=0) == -1
+
+    sessions[0].stats.in_flight = 1
+    sessions[1].stats.in_flight = 1
+    waiter = asyncio.ensure_future(pool.acquire().__aenter__())
+    await asyncio.sleep(0)
+
+    assert pool.waiting == 1
+    assert pool.scale_decision(1, 5, scale_up_wait=0, idle_timeout=0) == 1
+    assert pool.scale_decision(1, 2, scale_up_wait=0, idle_timeout=0) == 0
+    waiter.cancel()
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_quarantines_and_probes():
+    sessions = make_sessions(2)
+    pool = SessionPool(sessions, failure_threshold=2, quarantine_time=0.05)
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            async with pool.acquire(session_index=0):
+                raise ValueError()
+
+    assert sessions[0].stats.circuit == "open"
+    assert pool.is_quarantined(sessions[0])
+    async with pool.acquire() as (i, _):
+        assert i == 1
+
+    # soft failures don't quarantine a session
+    for _ in range(3):
+        with pytest.raises(FailedLease):
+            async with pool.acquire(session_index=1):
+                raise FailedLease({"status_code": 1})
+    assert sessions[1].stats.circuit == "closed"
+
+    await asyncio.sleep(0.06)
+    async with pool.acquire(exclude=[sessions[1]]) as (i, session):
+        assert i == 0
+        assert session.stats.circuit == "half_open"
+    assert sessions[0].stats.circuit == "closed"
+
+
+@pytest.mark.asyncio
+async def test_affinity_sticks_to_session_and_moves_on_failure():
+    sessions = make_sessions(3)
+    pool = SessionPool(sessions, failure_threshold=1)
+    affinity = SessionAffinity()
+
+    async with pool.acquire(affinity=affinity) as (_, first):
+        pass
+    for _ in range(3):
+        async with pool.acquire(affinity=affinity) as (_, session):
+            assert session is first
+    assert first.stats.pinned == 1
+
+    with pytest.raises(ValueError):
+        async with pool.acquire(affinity=affinity):
+            raise ValueError()
+    async with pool.acquire(affinity=affinity) as (_, session):
+        assert session is not first
+    assert first.stats.pinned == 0
+    assert session.stats.pinned == 1
+
+    affinity.release()
+    assert session.stats.pinned == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_requests_dont_count_against_session():
+    sessions = make_sessions(1)
+    pool = SessionPool(sessions, failure_threshold=2)
+
+    async def hung_request():
+        async with pool.acquire():
+            await asyncio.sleep(10)
+
+    for _ in range(4):
+        task = asyncio.ensure_future(hung_request())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    stats = sessions[0].stats
+    assert stats.in_flight == 0
+    assert stats.errors == 0
+    assert stats.error_rate == 0.0
+    assert pool.is_healthy(sessions[0])
+    assert not pool.is_quarantined(sessions[0])
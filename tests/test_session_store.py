@@ -0,0 +1,21 @@
+from TikTokApi.session_store import SessionStore
+import time
+
+
+def test_save_and_load_sessions(tmp_path):
+    store = SessionStore(str(tmp_path), max_age=60)
+    now = time.time()
+    store.save_all(
+        [
+            {"ms_token": "old", "created_at": now - 120},
+            {"ms_token": "new", "created_at": now},
+        ]
+    )
+
+    states = store.load()
+    assert [s["ms_token"] for s in states] == ["new", "old"]
+    assert store.is_fresh(states[0])
+    assert not store.is_fresh(states[1])
+
+    store.save_all([{"ms_token": "only", "created_at": now}])
+    assert [s["ms_token"] for s in store.load()] == ["only"]
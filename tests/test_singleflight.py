@@ -0,0 +1,32 @@
+from TikTokApi.singleflight import SingleFlight
+import asyncio
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_cancelled_only_when_every_caller_cancels():
+    flight = SingleFlight()
+    started = 0
+
+    async def fn():
+        nonlocal started
+        started += 1
+        await asyncio.sleep(0.05)
+        return "result"
+
+    first = asyncio.ensure_future(flight.do("key", fn))
+    second = asyncio.ensure_future(flight.do("key", fn))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "result"
+    assert started == 1
+    assert flight.calls == {}
+
+    third = asyncio.ensure_future(flight.do("key", fn))
+    await asyncio.sleep(0)
+    task = flight.calls["key"].task
+    third.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert flight.calls == {}
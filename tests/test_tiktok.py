@@ -0,0 +1,328 @@
+from TikTokApi import TikTokApi
+from TikTokApi.tiktok import TikTokPlaywrightSession
+from TikTokApi.exceptions import (
+    EmptyResponseException,
+    InvalidJSONException,
+    TimeoutException,
+)
+from TikTokApi.concurrency import AdaptiveConcurrencyLimiter
+from TikTokApi.rate_limit import RateLimiter
+from TikTokApi.transport import Transport
+import asyncio
+import json
+import pytest
+import requests
+import time
+
+
+class FakeTransport(Transport):
+    """Answers requests from a dict of url path -> list of bodies"""
+
+    def __init__(self, api, responses):
+        super().__init__(api)
+        self.responses = responses
+        self.urls = []
+
+    async def fetch(self, session, url, headers, timeout=None):
+        self.urls.append(url)
+        path = url.split("?")[0]
+        response = self.responses[path].pop(0)
+        if isinstance(response, float):
+            # a float is a request that hangs for that many seconds
+            await asyncio.sleep(response)
+            raise TimeoutException(None, "hung")
+        return response
+
+
+def make_api(responses, num_sessions=1):
+    api = TikTokApi()
+    api.transport = FakeTransport(api, responses)
+    for _ in range(num_sessions):
+        api.sessions.append(
+            TikTokPlaywrightSession(
+                None, None, params={"aid": "1988"}, headers={}, ms_token="token"
+            )
+        )
+    api.num_sessions = num_sessions
+    return api
+
+
+@pytest.mark.asyncio
+async def test_make_request_adds_session_params():
+    api = make_api({"/a": ['{"status_code": 0, "ok": true}']})
+    data = await api.make_request("/a", params={"x": 1})
+
+    assert data["ok"]
+    assert api.transport.urls == ["/a?aid=1988&x=1&msToken=token"]
+
+
+@pytest.mark.asyncio
+async def test_make_requests_keeps_order_and_item_errors():
+    api = make_api(
+        {
+            "/a": [json.dumps({"status_code": 0, "n": 1})],
+            "/b": ["", ""],
+            "/c": ["not json", json.dumps({"status_code": 0, "n": 3})],
+        }
+    )
+    results = await api.make_requests(
+        [{"url": "/a"}, {"url": "/b"}, {"url": "/c"}],
+        batch_size=2,
+        exponential_backoff=False,
+    )
+
+    assert results[0]["n"] == 1
+    assert isinstance(results[1], EmptyResponseException)
+    assert results[2]["n"] == 3
+
+
+@pytest.mark.asyncio
+async def test_session_recycled_after_requests():
+    api = make_api({"/a": ['{"status_code": 0}'] * 3})
+    old_session = api.sessions[0]
+    closed = []
+
+    async def create_session(**kwargs):
+        api.sessions.append(
+            TikTokPlaywrightSession(None, None, params={}, headers={}, ms_token="new")
+        )
+
+    async def close_session(session):
+        api.sessions.remove(session)
+        closed.append(session)
+
+    api._create_pool_session = create_session
+    api._close_session = close_session
+    api.recycle_after_requests = 2
+
+    await api.make_request("/a")
+    await api.make_request("/a")
+    assert old_session.draining
+
+    await asyncio.gather(*api._background_tasks)
+    assert closed == [old_session]
+    assert [s.ms_token for s in api.sessions] == ["new"]
+
+    await api.make_request("/a")
+    assert api.transport.urls[-1].endswith("msToken=new")
+
+
+@pytest.mark.asyncio
+async def test_captcha_retried_on_another_session():
+    api = make_api(
+        {"/a": ["<html>captcha</html>", '{"status_code": 0, "ok": true}']},
+        num_sessions=2,
+    )
+    data = await api.make_request("/a")
+
+    assert data["ok"]
+    failed = [s for s in api.sessions if s.stats.consecutive_errors == 1]
+    assert len(failed) == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_hung_request():
+    api = make_api({"/a": [5.0]})
+    start = time.time()
+
+    with pytest.raises(TimeoutException):
+        await api.make_request("/a", deadline=time.time() + 0.05)
+
+    assert time.time() - start < 1
+    # a cancelled request isn't held against the session
+    assert api.sessions[0].stats.consecutive_errors == 0
+    assert api.sessions[0].stats.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_are_coalesced():
+    api = make_api({"/a": ['{"status_code": 0, "n": 1}', '{"status_code": 0, "n": 2}']})
+
+    results = await asyncio.gather(
+        *(
+            api.make_request("/a", params={"id": 1, "msToken": f"t{i}"})
+            for i in range(10)
+        )
+    )
+
+    assert [r["n"] for r in results] == [1] * 10
+    assert len(api.transport.urls) == 1
+    assert api.singleflight.coalesced == 9
+
+
+@pytest.mark.asyncio
+async def test_throttled_endpoint_doesnt_hold_sessions():
+    ok = '{"status_code": 0}'
+    api = make_api({"/slow": [ok] * 5, "/fast": [ok]})
+    api.session_pool.max_concurrency_per_session = 1
+    api.rate_limiter = RateLimiter(endpoint_rates={"/slow": (1, 1)})
+
+    slow = [
+        asyncio.ensure_future(api.make_request("/slow", params={"n": n}))
+        for n in range(3)
+    ]
+    await asyncio.sleep(0.05)
+    start = time.monotonic()
+    await api.make_request("/fast")
+
+    # the queued /slow requests wait for tokens without a session leased
+    assert time.monotonic() - start < 0.5
+    for task in slow:
+        task.cancel()
+    await asyncio.gather(*slow, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_endpoint_limit_doesnt_hold_sessions():
+    api = make_api({"/slow": [1.0] * 3, "/fast": ['{"status_code": 0}']}, 2)
+    api.session_pool.max_concurrency_per_session = 1
+    api.concurrency_limiter = AdaptiveConcurrencyLimiter(initial=1)
+    api.sessions[0].proxy = "http://proxy1:8080"
+    api.sessions[1].proxy = "http://proxy2:8080"
+
+    slow = [
+        asyncio.ensure_future(api.make_request("/slow", params={"n": n}))
+        for n in range(3)
+    ]
+    await asyncio.sleep(0.05)
+    start = time.monotonic()
+    await api.make_request("/fast")
+
+    # the queued /slow requests wait for their endpoint's slot without a session leased
+    assert time.monotonic() - start < 0.5
+    for task in slow:
+        task.cancel()
+    await asyncio.gather(*slow, return_exceptions=True)
+
+
+class FakeBrowser:
+    def is_connected(self):
+        return True
+
+    def on(self, event, handler):
+        pass
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = self
+
+    def __call__(self):
+        return self
+
+    async def start(self):
+        return self
+
+    async def launch(self, **kwargs):
+        return FakeBrowser()
+
+
+@pytest.mark.asyncio
+async def test_startup_wave_spreads_sessions_over_browsers(monkeypatch):
+    monkeypatch.setattr("TikTokApi.tiktok.async_playwright", FakePlaywright())
+    api = TikTokApi()
+
+    async def create_session(**kwargs):
+        await asyncio.sleep(0.01)
+        api.sessions.append(
+            TikTokPlaywrightSession(None, None, browser=kwargs["browser"])
+        )
+
+    api._TikTokApi__create_session = create_session
+    await api.create_sessions(num_sessions=8, num_browsers=4)
+
+    counts = [
+        sum(1 for session in api.sessions if session.browser is browser)
+        for browser in api.browsers
+    ]
+    assert counts == [2, 2, 2, 2]
+
+
+@pytest.mark.asyncio
+async def test_retries_are_shared_across_sessions():
+    api = make_api({"/a": ["not json"] * 9}, num_sessions=3)
+
+    with pytest.raises(InvalidJSONException):
+        await api.make_request("/a", retries=3, exponential_backoff=False)
+
+    # one try on each session, not three
+    assert len(api.transport.urls) == 3
+
+
+class FailingBatchTransport(FakeTransport):
+    """Fails the first fetch_many outright and records how many fetches run at once"""
+
+    def __init__(self, api, responses):
+        super().__init__(api, responses)
+        self.failed = False
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def fetch(self, session, url, headers, timeout=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return await super().fetch(session, url, headers, timeout)
+        finally:
+            self.in_flight -= 1
+
+    async def fetch_many(self, session, requests, concurrency, timeout=None):
+        if not self.failed:
+            self.failed = True
+            raise Exception("page closed")
+        return await super().fetch_many(session, requests, concurrency, timeout)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_per_item():
+    ok = json.dumps({"status_code": 0})
+    api = make_api({})
+    api.transport = FailingBatchTransport(api, {"/a": [ok] * 4})
+
+    results = await api.make_requests(
+        [{"url": "/a", "params": {"n": n}} for n in range(4)],
+        batch_size=2,
+        exponential_backoff=False,
+    )
+
+    assert results == [{"status_code": 0}] * 4
+
+
+@pytest.mark.asyncio
+async def test_batches_respect_session_concurrency_cap():
+    ok = json.dumps({"status_code": 0})
+    api = make_api({})
+    api.transport = FailingBatchTransport(api, {"/a": [ok] * 40})
+    api.transport.failed = True
+    api.session_pool.max_concurrency_per_session = 4
+
+    results = await api.make_requests(
+        [{"url": "/a", "params": {"n": n}} for n in range(40)],
+        batch_size=10,
+        concurrency=10,
+    )
+
+    assert results == [{"status_code": 0}] * 40
+    assert api.transport.max_in_flight <= 4
+
+
+@pytest.mark.asyncio
+async def test_video_info_request_has_a_timeout(monkeypatch):
+    api = make_api({})
+    timeouts = []
+
+    def get(url, **kwargs):
+        timeouts.append(kwargs.get("timeout"))
+        raise requests.Timeout()
+
+    monkeypatch.setattr("TikTokApi.api.video.requests.get", get)
+    video = api.video(id="1")
+    video.url = "https://www.tiktok.com/@x/video/1"
+
+    with pytest.raises(TimeoutException):
+        await video.info(timeout=5, hedge=False)
+    with pytest.raises(TimeoutException):
+        await video.info(hedge=False)
+
+    assert timeouts == [5, 30]
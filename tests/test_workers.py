@@ -0,0 +1,87 @@
+from TikTokApi.exceptions import CaptchaException
+from TikTokApi.workers import WorkerPool, _exception_payload, _rebuild_exception
+import asyncio
+import pytest
+import queue
+
+
+@pytest.mark.asyncio
+async def test_worker_startup_failure_is_raised():
+    pool = WorkerPool(num_workers=1, session_options={"browser": "not-a-browser"})
+    with pytest.raises(Exception, match="Invalid browser argument passed"):
+        await pool.start()
+
+
+class FakeProcess:
+    def __init__(self, pid):
+        self.pid = pid
+        self.exitcode = None
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+
+def make_running_pool():
+    pool = WorkerPool(num_workers=1)
+    pool._task_queue = queue.Queue()
+    pool._result_queue = queue.Queue()
+    pool._processes = [FakeProcess(1)]
+    pool._control_queues = {1: queue.Queue()}
+    pool._reader = asyncio.ensure_future(pool._WorkerPool__read_results())
+    return pool
+
+
+async def take_task(pool):
+    task_id, _ = await asyncio.get_running_loop().run_in_executor(
+        None, pool._task_queue.get
+    )
+    pool._result_queue.put((task_id, "started", 1))
+    return task_id
+
+
+def test_exceptions_keep_message_and_error_code():
+    payload = _exception_payload(
+        CaptchaException(None, "TikTok is showing a captcha", error_code=10)
+    )
+    e = _rebuild_exception(*payload)
+
+    assert isinstance(e, CaptchaException)
+    assert e.message == "TikTok is showing a captcha"
+    assert e.error_code == 10
+    assert str(e) == "10 -> TikTok is showing a captcha"
+
+
+@pytest.mark.asyncio
+async def test_dead_worker_fails_its_tasks():
+    pool = make_running_pool()
+    request = asyncio.ensure_future(pool.request("/a"))
+    await take_task(pool)
+    await asyncio.sleep(0.1)
+    pool._processes[0].alive = False
+
+    with pytest.raises(Exception, match="exited"):
+        await asyncio.wait_for(request, 2)
+    pool._result_queue.put((None, "closed", None))
+    await pool._reader
+
+
+@pytest.mark.asyncio
+async def test_breaking_out_of_iterate_cancels_the_task():
+    pool = make_running_pool()
+
+    async def first_item():
+        async for item in pool.iterate("trending", "videos"):
+            return item
+
+    consumer = asyncio.ensure_future(first_item())
+    task_id = await take_task(pool)
+    pool._result_queue.put((task_id, "item", {"id": "1"}))
+
+    assert await asyncio.wait_for(consumer, 2) == {"id": "1"}
+    cancelled = await asyncio.get_running_loop().run_in_executor(
+        None, lambda: pool._control_queues[1].get(timeout=2)
+    )
+    assert cancelled == task_id
+    pool._result_queue.put((None, "closed", None))
+    await pool._reader